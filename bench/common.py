@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Helpers shared by the benchmark scripts.
+#
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def parse_options(argv):
+    '''
+    Returns a dictionary of the '--NAME=VALUE' options of the arguments,
+    with a value of True for any given as just '--NAME'.
+    '''
+    return dict(( arg[2:].split('=', 1) + [ True ] )[:2] for arg in argv if arg.startswith('--'))
+
+def median(values):
+    '''
+    Returns the median of the values, the mean of the middle two if there
+    are an even number of them.
+    '''
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else ( values[mid - 1] + values[mid] ) / 2
+
+#EOF
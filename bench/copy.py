@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Copy benchmark: times the copy of each file of a synthetic library to a
+# local directory with each of the copy methods of core/copier.py, at each
+# block size, alongside shutil.copy2() (with and without hashing the file
+# afterwards, as rc5tx needs its content hash), and reports the per-file
+# throughput of each as JSON so that runs may be compared.
+#
+# Usage:
+#
+#    python3 bench/copy.py [--source=DIR] [--count=N] [--duration=SECONDS]
+#            [--blocks=MB,...] [--runs=N] [--fsync] [--output=FILE]
+#
+# Unless an existing library is provided with --source, one is generated
+# (see generate.py) in a temporary directory, so the source is read from
+# the page cache. With --fsync each file is synced to the device before
+# the next is copied, so the time includes writing it to the device.
+#
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+import sys, os, json, time, shutil, tempfile, platform
+from pathlib import Path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from core.copier import COPY_BLOCK_SIZE, TRANSFER_BLOCK_SIZE, COPY_METHODS, copy_file, hash_file
+from core.walker import walk_wav_files
+from generate import generate_library
+from common import parse_options, median
+
+BLOCKS = ( COPY_BLOCK_SIZE, TRANSFER_BLOCK_SIZE )
+RUNS   = 3
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def copy2(source_file, target_file, fsync):
+    shutil.copy2(source_file, target_file)
+    if fsync:
+        sync_file(target_file)
+
+def copy2_hash(source_file, target_file, fsync):
+    copy2(source_file, target_file, fsync)
+    hash_file(source_file)
+
+def sync_file(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def get_cases(blocks):
+    '''
+    Returns a list of (name, function) of each way of copying a file.
+    '''
+    cases = [ ( 'copy2', copy2 ), ( 'copy2+hash', copy2_hash ) ]
+    # each method this platform has, not just the one 'auto' uses
+    for method in [ m for m in COPY_METHODS[1:] if m == 'buffer' or hasattr(os, m) ]:
+        for block_size in blocks:
+            def copy(source_file, target_file, fsync, method=method, block_size=block_size):
+                copy_file(source_file, target_file, block_size=block_size, method=method, fsync=fsync)
+            cases.append(( '{} {}MB'.format(method, block_size // ( 1024 * 1024 )), copy ))
+    return cases
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def run_once(copy, source_files, target, fsync):
+    '''
+    Copies each of the source files to the target directory, returning a
+    list of the throughput of each copy in bytes per second.
+    '''
+    throughputs = []
+    for i, source_file in enumerate(source_files):
+        target_file = os.path.join(target, '{:03d}.wav'.format(i))
+        start = time.perf_counter()
+        copy(source_file, target_file, fsync)
+        elapsed = time.perf_counter() - start
+        throughputs.append(os.path.getsize(source_file) / elapsed if elapsed > 0 else 0.0)
+    for entry in os.scandir(target):
+        os.remove(entry.path)
+    return throughputs
+
+# main ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def main(argv):
+    options = parse_options(argv)
+    runs = int(options.get('runs', RUNS))
+    fsync = bool(options.get('fsync'))
+    blocks = [ int(float(mb) * 1024 * 1024) for mb in options['blocks'].split(',') ] if 'blocks' in options else BLOCKS
+
+    work_dir = tempfile.mkdtemp(prefix='rc5tx-bench-')
+    try:
+        if 'source' in options:
+            source = Path(options['source'])
+        else:
+            source = Path(work_dir, 'library')
+            generate_library(source, count=int(options.get('count', 20)), duration=float(options.get('duration', 60.0)))
+        target = Path(work_dir, 'WAVE')
+        target.mkdir()
+        source_files = sorted(walk_wav_files(source))
+        source_bytes = sum(os.path.getsize(f) for f in source_files)
+        cases = {}
+        for name, copy in get_cases(blocks):
+            # warm up, then every file of every run is a sample
+            run_once(copy, source_files, target, fsync)
+            samples = [ throughput for _ in range(runs) for throughput in run_once(copy, source_files, target, fsync) ]
+            cases[name] = { 'min': min(samples), 'median': median(samples), 'max': max(samples) }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python':    platform.python_version(),
+        'platform':  platform.platform(),
+        'library':   { 'files': len(source_files), 'bytes': source_bytes, 'source': options.get('source') },
+        'runs':      runs,
+        'fsync':     fsync,
+        'cases':     cases
+    }
+
+    print('{} files, {:.1f}MB, {} runs{}, per-file throughput:'.format(len(source_files), source_bytes / 1e6, runs,
+            ', synced' if fsync else ''))
+    print('\n    copy:                      min (MB/s):    median (MB/s):    max (MB/s):    vs copy2:')
+    baseline = cases['copy2']['median']
+    for name, throughput in cases.items():
+        print('    {:<24}   {:>11.1f}    {:>14.1f}    {:>11.1f}    {:>+8.1f}%'.format(name, throughput['min'] / 1e6,
+                throughput['median'] / 1e6, throughput['max'] / 1e6, 100.0 * ( throughput['median'] - baseline ) / baseline))
+    if 'output' in options:
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=4)
+        print('\nwrote results to: {}'.format(options['output']))
+    return 0
+
+if __name__== "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+#EOF
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Generates a synthetic library of WAV files for benchmarking.
+#
+# Usage:
+#
+#    python3 bench/generate.py DIRECTORY [--count=N] [--duration=SECONDS]
+#            [--formats=FORMAT,...] [--depth=N] [--seed=N]
+#
+# where each FORMAT is 'sample_format:channels:rate', e.g., 'float32:2:44100'
+# (the RC-5's native format) or 'int24:1:48000'. Files are assigned formats
+# in rotation and distributed across nested directories 'depth' levels deep.
+#
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+import sys, os, struct, random
+
+from common import parse_options
+
+WAVE_FORMAT_PCM        = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+
+DEFAULT_FORMATS = [ 'float32:2:44100' ]
+# the size of the block of random sample data repeated to fill each file
+PATTERN_SIZE = 1024 * 1024
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def parse_format(spec):
+    '''
+    Parses a 'sample_format:channels:rate' specification, returning a tuple
+    of (format tag, bits per sample, channels, sample rate).
+    '''
+    sample_format, channels, rate = spec.split(':')
+    if sample_format.startswith('float'):
+        tag, bits = WAVE_FORMAT_IEEE_FLOAT, int(sample_format[5:])
+    elif sample_format == 'uint8':
+        tag, bits = WAVE_FORMAT_PCM, 8
+    elif sample_format.startswith('int'):
+        tag, bits = WAVE_FORMAT_PCM, int(sample_format[3:])
+    else:
+        raise ValueError('unrecognised sample format: {}'.format(sample_format))
+    return tag, bits, int(channels), int(rate)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def write_wav(path, spec, duration, pattern):
+    '''
+    Writes a WAV file of the specified format and duration in seconds, its
+    sample data filled by repeating the pattern. Returns the file size.
+    '''
+    tag, bits, channels, rate = parse_format(spec)
+    block_align = channels * bits // 8
+    data_size = int(duration * rate) * block_align
+    fmt = struct.pack('<HHIIHH', tag, channels, rate, rate * block_align, block_align, bits)
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 4 + 8 + len(fmt) + 8 + data_size) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<I', len(fmt)) + fmt)
+        f.write(b'data' + struct.pack('<I', data_size))
+        remaining = data_size
+        while remaining > 0:
+            n = min(remaining, len(pattern))
+            f.write(pattern[:n])
+            remaining -= n
+    return os.path.getsize(path)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def generate_library(root, count=99, duration=10.0, formats=None, depth=2, seed=0):
+    '''
+    Generates 'count' WAV files of 'duration' seconds beneath the root
+    directory, returning a list of their paths. Generation is deterministic
+    for a given seed.
+
+    :param root:      the root directory of the library
+    :param count:     the number of files
+    :param duration:  the duration of each file in seconds
+    :param formats:   a list of 'sample_format:channels:rate' specifications
+    :param depth:     the number of levels of nested directories
+    :param seed:      the random seed
+    '''
+    formats = formats or DEFAULT_FORMATS
+    rng = random.Random(seed)
+    pattern = bytes(rng.getrandbits(8) for _ in range(PATTERN_SIZE))
+    paths = []
+    for i in range(count):
+        # spread files across a few branches at each level, named out of order
+        parts = [ 'dir{}'.format(rng.randrange(3)) for _ in range(depth) ]
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'loop-{:04d}.wav'.format(rng.randrange(10000 * count)))
+        write_wav(path, formats[i % len(formats)], duration, pattern)
+        paths.append(path)
+    return paths
+
+# main ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def main(argv):
+    args = [ arg for arg in argv if not arg.startswith('--') ]
+    options = parse_options(argv)
+    if len(args) != 1:
+        print('usage: generate.py DIRECTORY [--count=N] [--duration=SECONDS] [--formats=FORMAT,...] [--depth=N] [--seed=N]')
+        return 1
+    paths = generate_library(args[0],
+            count=int(options.get('count', 99)),
+            duration=float(options.get('duration', 10.0)),
+            formats=options['formats'].split(',') if 'formats' in options else None,
+            depth=int(options.get('depth', 2)),
+            seed=int(options.get('seed', 0)))
+    print('generated {} files ({:.1f}MB) in {}'.format(len(paths), sum(os.path.getsize(p) for p in paths) / 1e6, args[0]))
+    return 0
+
+if __name__== "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+#EOF
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Startup benchmark: measures the cumulative import time of rc5tx using
+# 'python -X importtime' and fails (exit status 1) if it exceeds the budget,
+# or if any heavy module is imported at startup.
+#
+# Usage:
+#
+#    python3 bench/startup.py [--budget=MS] [--runs=N]
+#
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+import sys, os, subprocess
+
+from common import parse_options
+
+# the budget for the cumulative import time of rc5tx, in milliseconds
+BUDGET_MS = 150
+# the number of runs, of which the fastest is reported
+RUNS = 5
+# modules that must only be imported on the code paths that need them
+HEAVY_MODULES = ( 'numpy', 'scipy' )
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def import_times():
+    '''
+    Imports rc5tx in a fresh interpreter, returning a dictionary of module
+    name to cumulative import time in microseconds.
+    '''
+    result = subprocess.run([ sys.executable, '-X', 'importtime', '-c', 'import rc5tx' ],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+# main ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def main(argv):
+    options = parse_options(argv)
+    budget_ms = float(options.get('budget', BUDGET_MS))
+    runs = int(options.get('runs', RUNS))
+    samples = [ import_times() for _ in range(runs) ]
+    best_ms = min(times['rc5tx'] for times in samples) / 1000.0
+    heavy = sorted(name for name in samples[0] if name.split('.')[0] in HEAVY_MODULES)
+    print('rc5tx import time: {:.1f}ms (best of {}), budget: {:.0f}ms'.format(best_ms, runs, budget_ms))
+    ok = True
+    if heavy:
+        print('FAIL: heavy modules imported at startup: {}'.format(', '.join(heavy)))
+        ok = False
+    if best_ms > budget_ms:
+        print('FAIL: import time exceeds budget.')
+        ok = False
+    if ok:
+        print('ok.')
+    return 0 if ok else 1
+
+if __name__== "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+#EOF
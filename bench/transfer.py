@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Transfer benchmark: times each phase of a transfer (scan, sort, probe,
+# clean, copy, catalog) from a synthetic library to a local directory that
+# stands in for the RC-5's WAVE directory, and writes the timings as JSON so
+# that runs may be compared.
+#
+# Usage:
+#
+#    python3 bench/transfer.py [--source=DIR] [--count=N] [--duration=SECONDS]
+#            [--formats=FORMAT,...] [--depth=N] [--runs=N] [--throttle=MB/s]
+#            [--verify] [--output=FILE] [--compare=FILE]
+#
+# Unless an existing library is provided with --source, one is generated
+# (see generate.py) in a temporary directory. A warm-up transfer fills the
+# target before the timed runs, so each run cleans a full target. The
+# --throttle option limits the copy to the given rate, to imitate a slow
+# USB device. With --compare the medians are compared with those of an
+# earlier output file.
+#
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+import sys, os, io, json, time, shutil, tempfile, platform, contextlib
+from pathlib import Path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import rc5tx
+from core import transfer
+from core.logger import Logger, Level
+from core.walker import walk_wav_files
+from core.planner import target_size
+from core.catalog import Catalog
+from generate import generate_library
+from common import parse_options, median
+
+PHASES = ( 'scan', 'sort', 'probe', 'clean', 'copy', 'catalog' )
+RUNS   = 3
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def throttled(copy, rate):
+    '''
+    Returns a copy function that takes at least as long as copying at 'rate'
+    bytes per second would, to imitate a slow USB device.
+    '''
+    def copy_file(source_file, target_file, *args, **kwargs):
+        start = time.perf_counter()
+        content_hash = copy(source_file, target_file, *args, **kwargs)
+        delay = os.path.getsize(target_file) / rate - ( time.perf_counter() - start )
+        if delay > 0:
+            time.sleep(delay)
+        return content_hash
+    return copy_file
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def run_once(_log, source, target, catalog_dir, verify):
+    '''
+    Performs one transfer from the source to the target directory, returning
+    a dictionary of phase to elapsed seconds.
+    '''
+    times = {}
+    def timed(phase, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        times[phase] = time.perf_counter() - start
+        return result
+    files = timed('scan', lambda: list(walk_wav_files(source, prune=transfer.is_hidden)))
+    files = timed('sort', sorted, files, key=transfer.get_filename)
+    accepted, convertible, _rejected = timed('probe', transfer.validate_files, _log, files, limit=transfer.MAX_MEMORIES)
+    infos = dict(accepted + convertible)
+    source_files = [ f for f in files if f in infos ][:transfer.MAX_MEMORIES]
+    timed('clean', transfer.clean_target_directory, _log, target)
+    catalog = timed('copy', transfer.transfer_files, _log, source, source_files, target,
+            conversions=dict(convertible), verify=verify)
+    # the catalog is written to the console, and to a catalog database
+    def write_catalog():
+        records = transfer.get_catalog_records(catalog, source_files, infos, lambda f: target_size(infos[f]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            rc5tx.print_catalog(_log, records)
+        catalog_db = Catalog(os.path.join(catalog_dir, rc5tx.CATALOG_FILENAME))
+        catalog_db.add_run(time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'transfer', source, target, records)
+        catalog_db.close()
+    timed('catalog', write_catalog)
+    return times
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def print_comparison(results, previous):
+    '''
+    Prints the change in the median time of each phase from an earlier run.
+    '''
+    print('\n    phase:         before (s):    after (s):    change:')
+    for phase in PHASES:
+        before = previous['phases'].get(phase, {}).get('median')
+        after = results['phases'][phase]['median']
+        change = '{:+.1f}%'.format(100.0 * ( after - before ) / before) if before else '-'
+        print('    {:<12}   {:>11}    {:>10.4f}    {:>7}'.format(phase,
+                '{:.4f}'.format(before) if before is not None else '-', after, change))
+
+# main ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def main(argv):
+    options = parse_options(argv)
+    runs = int(options.get('runs', RUNS))
+    rate = float(options['throttle']) * 1e6 if 'throttle' in options else None
+    _log = Logger('bench', level=Level.ERROR)
+    if rate:
+        transfer.copy_file = throttled(transfer.copy_file, rate)
+
+    work_dir = tempfile.mkdtemp(prefix='rc5tx-bench-')
+    try:
+        if 'source' in options:
+            source = Path(options['source'])
+        else:
+            source = Path(work_dir, 'library')
+            generate_library(source,
+                    count=int(options.get('count', transfer.MAX_MEMORIES)),
+                    duration=float(options.get('duration', 10.0)),
+                    formats=options['formats'].split(',') if 'formats' in options else None,
+                    depth=int(options.get('depth', 2)))
+        target = Path(work_dir, 'WAVE')
+        target.mkdir()
+        # conversions are cached by content, so are kept apart from the user's cache
+        os.environ['XDG_CACHE_HOME'] = os.path.join(work_dir, 'cache')
+        source_files = list(walk_wav_files(source, prune=transfer.is_hidden))
+        source_bytes = sum(os.path.getsize(f) for f in source_files)
+
+        # warm up the page cache and fill the target
+        run_once(_log, source, target, work_dir, False)
+        samples = [ run_once(_log, source, target, work_dir, bool(options.get('verify'))) for _ in range(runs) ]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python':    platform.python_version(),
+        'platform':  platform.platform(),
+        'library':   { 'files': len(source_files), 'bytes': source_bytes, 'source': options.get('source'),
+                       'formats': options.get('formats'), 'depth': options.get('depth'), 'duration': options.get('duration') },
+        'runs':      runs,
+        'throttle':  rate,
+        'verify':    bool(options.get('verify')),
+        'phases':    { phase: { 'min': min(s[phase] for s in samples), 'median': median(s[phase] for s in samples),
+                               'max': max(s[phase] for s in samples) } for phase in PHASES }
+    }
+    copy_median = results['phases']['copy']['median']
+    results['copy_throughput'] = source_bytes / copy_median if copy_median > 0 else None
+
+    print('{} files, {:.1f}MB, {} runs{}:'.format(len(source_files), source_bytes / 1e6, runs,
+            ', throttled to {:.1f}MB/s'.format(rate / 1e6) if rate else ''))
+    print('\n    phase:         min (s):    median (s):    max (s):')
+    for phase in PHASES:
+        times = results['phases'][phase]
+        print('    {:<12}   {:>8.4f}    {:>11.4f}    {:>8.4f}'.format(phase, times['min'], times['median'], times['max']))
+    if results['copy_throughput']:
+        print('\n    copy throughput: {:.1f}MB/s'.format(results['copy_throughput'] / 1e6))
+    if 'compare' in options:
+        with open(options['compare'], 'r') as f:
+            print_comparison(results, json.load(f))
+    if 'output' in options:
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=4)
+        print('\nwrote results to: {}'.format(options['output']))
+    return 0
+
+if __name__== "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+#EOF
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from core.wavinfo import WavInfo, RC5_CHANNELS
+from core.convert import _decode
+
+# loudness is measured over 400ms blocks overlapping by 75%, i.e., the mean of
+# four consecutive 100ms segments
+SEGMENT_SECONDS   = 0.1
+BLOCK_SEGMENTS    = 4
+# the number of segments decoded from the mapped file at a time (10 seconds)
+CHUNK_SEGMENTS    = 100
+# blocks quieter than the absolute gate, or than the relative gate below the
+# loudness of the blocks passing the absolute gate, are not counted
+ABSOLUTE_GATE     = -70.0
+RELATIVE_GATE     = -10.0
+# the maximum peak after normalisation, in dBFS
+PEAK_CEILING      = -1.0
+# gains smaller than this (in dB) are not applied
+MINIMUM_GAIN      = 0.1
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def _biquad_power(b, a, w):
+    '''
+    Returns the power response of a biquad filter at the angular
+    frequencies 'w' (radians per sample).
+    '''
+    z = np.exp(-1j * w)
+    return np.abs(( b[0] + b[1] * z + b[2] * z * z ) / ( a[0] + a[1] * z + a[2] * z * z )) ** 2
+
+def k_weighting(sample_rate, n):
+    '''
+    Returns the power response of the ITU-R BS.1770 K-weighting filter (a
+    high shelf at 1.5kHz followed by a high-pass at 38Hz) at the frequencies
+    of an 'n' point real FFT.
+    '''
+    w = 2.0 * math.pi * np.fft.rfftfreq(n, 1.0 / sample_rate) / sample_rate
+    # high shelf: +4dB above 1.5kHz
+    A = 10.0 ** ( 4.0 / 40.0 )
+    w0 = 2.0 * math.pi * 1500.0 / sample_rate
+    alpha = math.sin(w0) / ( 2.0 * ( 1.0 / math.sqrt(2.0) ))
+    cos_w0 = math.cos(w0)
+    shelf = _biquad_power(
+            ( A * (( A + 1 ) + ( A - 1 ) * cos_w0 + 2 * math.sqrt(A) * alpha ),
+              -2 * A * (( A - 1 ) + ( A + 1 ) * cos_w0 ),
+              A * (( A + 1 ) + ( A - 1 ) * cos_w0 - 2 * math.sqrt(A) * alpha )),
+            ( ( A + 1 ) - ( A - 1 ) * cos_w0 + 2 * math.sqrt(A) * alpha,
+              2 * (( A - 1 ) - ( A + 1 ) * cos_w0 ),
+              ( A + 1 ) - ( A - 1 ) * cos_w0 - 2 * math.sqrt(A) * alpha ), w)
+    # high-pass at 38Hz
+    w0 = 2.0 * math.pi * 38.0 / sample_rate
+    alpha = math.sin(w0) / ( 2.0 * 0.5 )
+    cos_w0 = math.cos(w0)
+    high_pass = _biquad_power(
+            ( ( 1 + cos_w0 ) / 2, -( 1 + cos_w0 ), ( 1 + cos_w0 ) / 2 ),
+            ( 1 + alpha, -2 * cos_w0, 1 - alpha ), w)
+    return shelf * high_pass
+
+def _db(power):
+    return 10.0 * math.log10(power) if power > 0 else None
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def analyse_wav(path):
+    '''
+    Returns the levels of the WAV file as a dictionary of its sample 'peak'
+    and 'rms' level in dBFS and its integrated 'loudness' in LUFS, any of
+    which is None for a silent file.
+
+    The sample data is memory-mapped and decoded 10 seconds at a time, so
+    memory use is bounded regardless of the file's length. Loudness is an
+    estimate of the ITU-R BS.1770 integrated loudness: the K-weighting is
+    applied to the spectrum of each 100ms segment rather than by filtering
+    the signal, which is close for all but the lowest frequencies. It is
+    the loudness as played by the RC-5, so a mono file counts as both
+    channels of a stereo file.
+    '''
+    info = WavInfo(path)
+    segment = max(1, int(info.sample_rate * SEGMENT_SECONDS))
+    weighting = k_weighting(info.sample_rate, segment)
+    peak = 0.0
+    sum_squares = 0.0
+    powers = []
+    if info.frames > 0:
+        data = np.memmap(path, dtype=np.uint8, mode='r', offset=info.data_offset,
+                shape=( info.frames * info.block_align, ))
+        chunk_bytes = CHUNK_SEGMENTS * segment * info.block_align
+        for start in range(0, len(data), chunk_bytes):
+            frames = _decode(data[start:start + chunk_bytes], info.sample_format, info.channels)
+            peak = max(peak, float(np.max(np.abs(frames))))
+            sum_squares += float(np.sum(np.square(frames, dtype=np.float64)))
+            # the mean square of each K-weighted segment, summed over channels
+            count = len(frames) // segment
+            if count > 0:
+                spectrum = np.fft.rfft(frames[:count * segment].reshape(count, segment, info.channels), axis=1)
+                power = np.abs(spectrum) ** 2 * weighting[:, np.newaxis]
+                # by Parseval's theorem, counting the bins mirrored by the real FFT twice
+                power[:, 1:( segment + 1 ) // 2] *= 2.0
+                # a mono file is played on both channels of the RC-5's stereo output
+                powers.append(np.sum(power, axis=( 1, 2 )) * ( RC5_CHANNELS / info.channels if info.channels == 1 else 1.0 )
+                        / ( segment * segment ))
+        del data
+    rms = math.sqrt(sum_squares / ( info.frames * info.channels )) if info.frames > 0 else 0.0
+    return {
+        'peak':     _db(peak * peak),
+        'rms':      _db(rms * rms),
+        'loudness': _gated_loudness(np.concatenate(powers) if powers else np.zeros(0))
+    }
+
+def _gated_loudness(powers):
+    '''
+    Returns the gated loudness in LUFS of the mean square powers of
+    consecutive segments, or None if no block passes the gates.
+    '''
+    if len(powers) < BLOCK_SEGMENTS:
+        if len(powers) == 0:
+            return None
+        blocks = np.array([ np.mean(powers) ])
+    else:
+        blocks = np.convolve(powers, np.ones(BLOCK_SEGMENTS) / BLOCK_SEGMENTS, mode='valid')
+    with np.errstate(divide='ignore'):
+        loudness = -0.691 + 10.0 * np.log10(blocks)
+    blocks = blocks[loudness > ABSOLUTE_GATE]
+    if len(blocks) == 0:
+        return None
+    relative = -0.691 + 10.0 * math.log10(np.mean(blocks)) + RELATIVE_GATE
+    with np.errstate(divide='ignore'):
+        blocks = blocks[-0.691 + 10.0 * np.log10(blocks) > relative]
+    return -0.691 + 10.0 * math.log10(np.mean(blocks))
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def analyse_files(paths, workers=None):
+    '''
+    Analyses the WAV files on a pool of 'workers' processes (by default one
+    per CPU), returning a list of their levels in the same order. A file
+    that can't be read has levels of None.
+    '''
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [ executor.submit(analyse_wav, path) for path in paths ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except ( OSError, ValueError ):
+                results.append(None)
+        return results
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def normalising_gain(levels, target_loudness, ceiling=PEAK_CEILING):
+    '''
+    Returns the linear gain that brings a file with the given levels to
+    the target loudness (in LUFS), reduced if necessary so that its peak
+    doesn't exceed the ceiling (in dBFS), or None if no gain is needed.
+    '''
+    if not levels or levels['loudness'] is None or levels['peak'] is None:
+        return None
+    gain = min(target_loudness - levels['loudness'], ceiling - levels['peak'])
+    if abs(gain) < MINIMUM_GAIN:
+        return None
+    return 10.0 ** ( gain / 20.0 )
+
+#EOF
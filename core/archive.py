@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, json, time
+
+from core.copier import new_digest
+
+ARCHIVE_VERSION   = 1
+# the archived files, each named by its content hash
+OBJECTS_DIRNAME   = 'objects'
+# a directory for each pull that found a change
+SNAPSHOTS_DIRNAME = 'snapshots'
+SNAPSHOT_FILENAME = 'snapshot.json'
+# the identity of each file of the RC-5 when last pulled
+INDEX_FILENAME    = 'index.json'
+# the number and size of the blocks of a file sampled to confirm it is unchanged
+SAMPLE_BLOCKS     = 16
+SAMPLE_BYTES      = 64 * 1024
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def sample_hash(path, size, blocks=SAMPLE_BLOCKS, block_size=SAMPLE_BYTES):
+    '''
+    Returns a hash (as hex) of the size of the file and of 'blocks' blocks
+    spread evenly through it, from its start to its end. However long the
+    file, only a small fixed amount of it is read, so this is a cheap check
+    that a file whose size and time haven't changed hasn't been rewritten:
+    an overdub leaves the size of a loop as it was, and the RC-5 may not
+    change its time.
+    '''
+    digest = new_digest()
+    digest.update(str(size).encode('ascii'))
+    with open(path, 'rb') as f:
+        if size <= blocks * block_size:
+            digest.update(f.read())
+        else:
+            step = ( size - block_size ) / ( blocks - 1 )
+            for i in range(blocks):
+                f.seek(int(i * step))
+                digest.update(f.read(block_size))
+    return digest.hexdigest()
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class Archive(object):
+    '''
+    A content-addressed archive of the memories pulled from an RC-5. Each
+    distinct file is stored once, named by its content hash, beneath the
+    'objects' directory. Each pull that finds a change adds a snapshot: a
+    directory beneath 'snapshots' laid out as the WAVE directory was, of
+    hard links to the archived files, and a snapshot.json file listing its
+    memories and their hashes. Where the archive's filesystem doesn't
+    support hard links the snapshot.json is the only record of a snapshot.
+
+    An index of the size, modification time, sample hash and content hash
+    of each file on the RC-5 when last pulled is kept, so that the next
+    pull need read only a sample of a file that appears unchanged.
+
+    :param root:  the archive directory, created if necessary
+    '''
+    def __init__(self, root):
+        self._root  = os.fspath(root)
+        self._index = {}
+        self._links = True
+        os.makedirs(os.path.join(self._root, OBJECTS_DIRNAME), exist_ok=True)
+        os.makedirs(os.path.join(self._root, SNAPSHOTS_DIRNAME), exist_ok=True)
+        index_path = os.path.join(self._root, INDEX_FILENAME)
+        if os.path.isfile(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == ARCHIVE_VERSION:
+                    self._index = data.get('files', {})
+            except ValueError:
+                pass # a corrupt index only means every file is copied and hashed again
+        # anything outside an object's directory was left by an interrupted pull
+        for entry in os.scandir(os.path.join(self._root, OBJECTS_DIRNAME)):
+            if entry.is_file():
+                os.remove(entry.path)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def links(self):
+        '''
+        False once a hard link has failed, i.e., snapshots are only recorded
+        by their snapshot.json.
+        '''
+        return self._links
+
+    def object_path(self, content_hash):
+        '''
+        Returns the path of the archived file of the content hash, whether or
+        not it exists.
+        '''
+        return os.path.join(self._root, OBJECTS_DIRNAME, content_hash[:2], content_hash + '.wav')
+
+    def incoming_path(self, name):
+        '''
+        Returns a path at which a file may be written before it's added.
+        '''
+        return os.path.join(self._root, OBJECTS_DIRNAME, name)
+
+    def has(self, content_hash):
+        return os.path.isfile(self.object_path(content_hash))
+
+    def add(self, path, content_hash):
+        '''
+        Moves the file at 'path' into the archive as the file of the content
+        hash, or deletes it if the archive already holds that content.
+        Returns True if it was added.
+        '''
+        object_path = self.object_path(content_hash)
+        if os.path.isfile(object_path):
+            os.remove(path)
+            return False
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        os.replace(path, object_path)
+        return True
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def identify(self, key, stat):
+        '''
+        Returns the index entry of the file (by its path within the WAVE
+        directory) if its size and modification time are as when it was
+        last pulled and its content is still archived, otherwise None.
+        '''
+        entry = self._index.get(key)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime_ns \
+                or not self.has(entry['hash']):
+            return None
+        return entry
+
+    def remember(self, key, stat, sample, content_hash):
+        '''
+        Records the identity of the file as pulled.
+        '''
+        self._index[key] = { 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sample': sample, 'hash': content_hash }
+
+    def forget(self, keys):
+        '''
+        Removes all but the given keys from the index, i.e., those files no
+        longer on the RC-5.
+        '''
+        self._index = { key: entry for key, entry in self._index.items() if key in keys }
+
+    def save(self):
+        '''
+        Writes the index to a temporary file then renames it into place, so
+        an interrupted write never leaves a corrupt index.
+        '''
+        index_path = os.path.join(self._root, INDEX_FILENAME)
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({ 'version': ARCHIVE_VERSION, 'files': self._index }, f, indent=4)
+        os.replace(tmp_path, index_path)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def snapshots(self):
+        '''
+        Returns the sorted list of snapshot names, oldest first.
+        '''
+        directory = os.path.join(self._root, SNAPSHOTS_DIRNAME)
+        return sorted(name for name in os.listdir(directory)
+                if os.path.isfile(os.path.join(directory, name, SNAPSHOT_FILENAME)))
+
+    def latest_directory(self):
+        '''
+        Returns the directory of the latest snapshot, or None if there is none.
+        '''
+        names = self.snapshots()
+        return os.path.join(self._root, SNAPSHOTS_DIRNAME, names[-1]) if names else None
+
+    def latest(self):
+        '''
+        Returns the dictionary of the memories of the latest snapshot, as
+        for snapshot(), or an empty dictionary if there is none.
+        '''
+        directory = self.latest_directory()
+        if directory is None:
+            return {}
+        try:
+            with open(os.path.join(directory, SNAPSHOT_FILENAME), 'r') as f:
+                return json.load(f).get('memories', {})
+        except ValueError:
+            return {} # a corrupt snapshot is compared as no snapshot
+
+    def snapshot(self, memories, target):
+        '''
+        Adds a snapshot of the memories, a dictionary of each file's path
+        within the WAVE directory to a dictionary of its 'memory' number,
+        'name', 'size' and content 'hash', returning the snapshot directory.
+        Each file is hard linked into the snapshot where possible.
+        '''
+        pulled = time.gmtime()
+        name = time.strftime('%Y%m%dT%H%M%SZ', pulled)
+        directory = os.path.join(self._root, SNAPSHOTS_DIRNAME, name)
+        count = 1
+        while os.path.exists(directory):
+            count += 1
+            directory = os.path.join(self._root, SNAPSHOTS_DIRNAME, '{}-{}'.format(name, count))
+        os.makedirs(directory)
+        for key, memory in sorted(memories.items()):
+            if not self._links:
+                break
+            link_path = os.path.join(directory, key)
+            os.makedirs(os.path.dirname(link_path), exist_ok=True)
+            try:
+                os.link(self.object_path(memory['hash']), link_path)
+            except OSError:
+                self._links = False
+        # written last, so a snapshot without one is incomplete and ignored
+        with open(os.path.join(directory, SNAPSHOT_FILENAME), 'w') as f:
+            json.dump({ 'version': ARCHIVE_VERSION, 'pulled': time.strftime('%Y-%m-%dT%H:%M:%SZ', pulled),
+                    'target': os.fspath(target), 'links': self._links, 'memories': memories }, f, indent=4)
+        return directory
+
+#EOF
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def parse_pins(spec):
+    '''
+    Parses a comma-separated list of 'MEMORY:NAME' pins (e.g., '1:intro.wav,
+    37:outro.wav'), returning a list of (memory, name) pairs.
+    '''
+    pins = []
+    for item in spec.split(','):
+        memory, sep, name = item.strip().partition(':')
+        if not sep or not memory.isdigit() or not name:
+            raise ValueError('expected a pin as MEMORY:NAME, not: {}'.format(item))
+        pins.append(( int(memory), name ))
+    return pins
+
+def read_playlist(path, memories=99, known=None):
+    '''
+    Reads a playlist file of one file name per line, in the order they are
+    to be assigned memories. A line may begin with a memory number (from 1
+    to 'memories') and a colon to pin the file to that memory, as for
+    parse_pins(), e.g., '37: outro.wav' or '37:outro.wav'; any other line,
+    or one that is itself a name found in the optional 'known' set (e.g.,
+    '12:34 take.wav'), is taken whole as a name. Blank lines and lines
+    beginning with '#' are ignored. Returns a tuple of the list of names and
+    the list of (memory, name) pins.
+    '''
+    names = []
+    pins  = []
+    known = known or set()
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            memory, sep, name = line.partition(':')
+            memory, name = memory.strip(), name.strip()
+            if sep and memory.isdigit() and 1 <= int(memory) <= memories and name and line not in known:
+                pins.append(( int(memory), name ))
+            else:
+                names.append(line)
+    return names, pins
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def assign_memories(source, source_files, order=None, pins=None, memories=99):
+    '''
+    Assigns the source files to memories, returning a list in which the
+    file at index i is assigned memory i+1, and None marks an empty memory.
+    Pinned files are assigned their memory; the files named in 'order' are
+    then assigned the free memories in that order, followed by the rest of
+    the source files in the order given.
+
+    Names are matched against the file name, or against the path relative
+    to the source directory where a name is ambiguous. Raises a ValueError
+    if a name doesn't match exactly one source file, if a pin is out of
+    range or conflicts with another, or if there are more files than
+    memories.
+
+    :param source:        the source directory
+    :param source_files:  the source files, in their default order
+    :param order:         an optional list of names in the order to assign them
+    :param pins:          an optional list of (memory, name) pairs
+    :param memories:      the number of memories
+    '''
+    by_name = {}
+    for source_file in source_files:
+        for name in { os.path.basename(source_file), os.path.relpath(source_file, source) }:
+            by_name.setdefault(name, []).append(source_file)
+    def lookup(name):
+        matches = by_name.get(name) or by_name.get(os.path.normpath(name))
+        if not matches:
+            raise ValueError('no source file matches: {}'.format(name))
+        if len(matches) > 1:
+            raise ValueError('more than one source file matches (use its path within the source): {}'.format(name))
+        return matches[0]
+    slots = [ None ] * memories
+    assigned = set()
+    for memory, name in pins or []:
+        source_file = lookup(name)
+        if memory < 1 or memory > memories:
+            raise ValueError('memory {} is out of range for: {}'.format(memory, name))
+        if slots[memory-1] is not None:
+            raise ValueError('memory {} is pinned to more than one file: {}'.format(memory, name))
+        if source_file in assigned:
+            raise ValueError('file is pinned to more than one memory: {}'.format(name))
+        slots[memory-1] = source_file
+        assigned.add(source_file)
+    ordered = [ lookup(name) for name in order or [] ] + list(source_files)
+    free = ( i for i, slot in enumerate(slots) if slot is None )
+    for source_file in ordered:
+        if source_file not in assigned:
+            memory = next(free, None)
+            if memory is None:
+                raise ValueError('more source files ({}) than memories ({})'.format(len(set(source_files)), memories))
+            slots[memory] = source_file
+            assigned.add(source_file)
+    while slots and slots[-1] is None:
+        slots.pop()
+    return slots
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def plan_renames(moves, temp):
+    '''
+    Orders the moves of a dictionary of source to destination memories
+    (each destination distinct) into a list of (from, to) renames that can
+    be made one at a time without overwriting a memory before it has been
+    moved away. A move is made once its destination has been vacated; any
+    moves left are cycles, each broken by moving one memory aside to 'temp'
+    and from there to its destination once the rest of the cycle has moved,
+    so a chain of n moves takes n renames and a cycle of n moves takes n+1.
+    '''
+    pending = dict(moves)
+    renames = []
+    while pending:
+        ready = [ source for source, destination in pending.items() if destination not in pending ]
+        if ready:
+            for source in ready:
+                renames.append(( source, pending.pop(source) ))
+        else:
+            source = next(iter(pending))
+            renames.append(( source, temp ))
+            pending[temp] = pending.pop(source)
+    return renames
+
+#EOF
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def cache_directory(name):
+    '''
+    Returns the path of the named rc5tx cache directory, creating it if
+    necessary. This is beneath $XDG_CACHE_HOME, or ~/.cache if unset.
+    '''
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    directory = os.path.join(base, 'rc5tx', name)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class ContentCache(object):
+    '''
+    A directory of files named by the content hash of the source they
+    were derived from, so a file is only derived once for given content.
+
+    If 'max_bytes' is provided the cache is bounded: prune() deletes the
+    least recently used files until the cache is no larger. Use is tracked
+    by modification time, which get() updates, since access times are often
+    not recorded.
+
+    :param name:       the name of the cache directory
+    :param extension:  the file extension of cached files
+    :param max_bytes:  the optional maximum size of the cache in bytes
+    '''
+    def __init__(self, name, extension, max_bytes=None):
+        self._directory = cache_directory(name)
+        self._extension = extension
+        self._max_bytes = max_bytes
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def directory(self):
+        return self._directory
+
+    def path(self, content_hash):
+        '''
+        Return the path of the cached file for the content hash, whether or
+        not it exists.
+        '''
+        return os.path.join(self._directory, content_hash + self._extension)
+
+    def get(self, content_hash):
+        '''
+        Return the path of the cached file for the content hash if it
+        exists, otherwise None.
+        '''
+        path = self.path(content_hash)
+        if not os.path.isfile(path):
+            return None
+        if self._max_bytes is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass # still usable, it just may be evicted sooner
+        return path
+
+    def put(self, content_hash, data):
+        '''
+        Writes the bytes as the cached file for the content hash, returning
+        its path. The file is written to a temporary name and renamed, so
+        a concurrent reader never sees a partial file.
+        '''
+        path = self.path(content_hash)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def prune(self):
+        '''
+        Deletes the least recently used files until the cache is no larger
+        than its maximum size, returning the number of files deleted.
+        '''
+        if self._max_bytes is None:
+            return 0
+        entries = []
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                if entry.name.endswith(self._extension) and entry.is_file():
+                    stat = entry.stat()
+                    entries.append(( stat.st_mtime_ns, stat.st_size, entry.path ))
+        total = sum(entry[1] for entry in entries)
+        deleted = 0
+        for _mtime, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            deleted += 1
+        return deleted
+
+#EOF
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import csv, json, sqlite3
+
+from core.transfer import format_duration, format_level
+
+CATALOG_VERSION = 3
+# the formats to which a catalog may be exported
+EXPORT_FORMATS  = ( 'md', 'json', 'csv' )
+# the fields of each record, in the order exported
+FIELDS = ( 'run', 'started', 'memory', 'size', 'duration', 'format', 'peak', 'rms', 'loudness', 'waveform', 'hash', 'status', 'source', 'target' )
+# the columns added to the files table by each version
+_MIGRATIONS = {
+    2: ( 'peak REAL', 'rms REAL', 'loudness REAL' ),
+    3: ( 'waveform TEXT', )
+}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    started  TEXT NOT NULL,
+    mode     TEXT NOT NULL,
+    source   TEXT NOT NULL,
+    target   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    run      INTEGER NOT NULL REFERENCES runs ( id ),
+    memory   INTEGER NOT NULL,
+    name     TEXT NOT NULL,
+    source   TEXT NOT NULL,
+    target   TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    format   TEXT NOT NULL,
+    hash     TEXT,
+    status   TEXT,
+    peak     REAL,
+    rms      REAL,
+    loudness REAL,
+    waveform TEXT,
+    PRIMARY KEY ( run, memory )
+);
+CREATE INDEX IF NOT EXISTS files_by_memory ON files ( memory, run );
+CREATE INDEX IF NOT EXISTS files_by_name   ON files ( name );
+CREATE INDEX IF NOT EXISTS files_by_hash   ON files ( hash );
+'''
+
+_SELECT = '''
+SELECT files.run, runs.started, files.memory, files.size, files.duration, files.format,
+       files.peak, files.rms, files.loudness, files.waveform, files.hash, files.status, files.source, files.target
+FROM files JOIN runs ON runs.id = files.run
+'''
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class Catalog(object):
+    '''
+    A SQLite database of every file transferred, recording for each run its
+    time, mode, source and target, and for each memory written the source
+    and target files, size, duration, format, levels and waveform (if
+    analysed), content hash and verification status. Files are indexed by memory, file name and content hash.
+
+    :param path:  the path to the database file
+    '''
+    def __init__(self, path):
+        self._path = path
+        self._db   = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            version = self._db.execute('PRAGMA user_version').fetchone()[0]
+            exists = self._db.execute("SELECT count(*) FROM sqlite_master WHERE name = 'files'").fetchone()[0]
+            if exists:
+                # a database from an earlier version gains the columns added since
+                for v in sorted(_MIGRATIONS):
+                    if version < v:
+                        for column in _MIGRATIONS[v]:
+                            self._db.execute('ALTER TABLE files ADD COLUMN {}'.format(column))
+            self._db.executescript(_SCHEMA)
+            self._db.execute('PRAGMA user_version = {}'.format(CATALOG_VERSION))
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def path(self):
+        return self._path
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def add_run(self, started, mode, source, target, records):
+        '''
+        Adds a run and the records of the memories it wrote (dictionaries with
+        the keys 'memory', 'name', 'source', 'target', 'size', 'duration',
+        'format', 'hash' and 'status', and optionally the levels 'peak', 'rms'
+        and 'loudness' and the 'waveform' sparkline) in a single transaction,
+        returning the ID of the run.
+        '''
+        with self._db:
+            cursor = self._db.execute('INSERT INTO runs ( started, mode, source, target ) VALUES ( ?, ?, ?, ? )',
+                    ( started, mode, str(source), str(target) ))
+            run = cursor.lastrowid
+            self._db.executemany('''INSERT INTO files ( run, memory, name, source, target, size, duration, format, hash, status,
+                            peak, rms, loudness, waveform )
+                    VALUES ( :run, :memory, :name, :source, :target, :size, :duration, :format, :hash, :status,
+                            :peak, :rms, :loudness, :waveform )''',
+                    [ dict({ 'peak': None, 'rms': None, 'loudness': None, 'waveform': None }, **record, run=run)
+                            for record in records ])
+        return run
+
+    def latest_run(self):
+        '''
+        Returns the ID of the most recent run, or None if there are none.
+        '''
+        return self._db.execute('SELECT max(id) FROM runs').fetchone()[0]
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def records(self, run=None):
+        '''
+        Returns the records of the run (by default the most recent) in memory
+        order, as dictionaries with the keys in FIELDS.
+        '''
+        run = run if run is not None else self.latest_run()
+        rows = self._db.execute(_SELECT + 'WHERE files.run = ? ORDER BY files.memory', ( run, ))
+        return [ dict(row) for row in rows ]
+
+    def find(self, memory=None, name=None, content_hash=None):
+        '''
+        Returns the records of every run matching the memory number, file
+        name or content hash, most recent first.
+        '''
+        if memory is not None:
+            rows = self._db.execute(_SELECT + 'WHERE files.memory = ? ORDER BY files.run DESC', ( memory, ))
+        elif name is not None:
+            rows = self._db.execute(_SELECT + 'WHERE files.name = ? ORDER BY files.run DESC', ( name, ))
+        else:
+            rows = self._db.execute(_SELECT + 'WHERE files.hash = ? ORDER BY files.run DESC', ( content_hash, ))
+        return [ dict(row) for row in rows ]
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @staticmethod
+    def export(records, export_format, fout):
+        '''
+        Writes the records to the file object as a markdown table, JSON or
+        CSV, as 'export_format' is 'md', 'json' or 'csv'.
+        '''
+        if export_format == 'json':
+            json.dump(records, fout, indent=4)
+            fout.write('\n')
+        elif export_format == 'csv':
+            writer = csv.DictWriter(fout, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(records)
+        elif export_format == 'md':
+            fout.write('| run | started | memory | size (KB) | duration | format | peak (dBFS) | loudness (LUFS) | waveform | status | file |\n')
+            fout.write('|----:|---------|-------:|----------:|---------:|--------|------------:|----------------:|----------|--------|------|\n')
+            for record in records:
+                fout.write('| {} | {} | {:02d} | {} | {} | {} | {} | {} | {} | {} | {} |\n'.format(record['run'], record['started'],
+                        record['memory'], int(record['size'] / 1000.0), format_duration(record['duration']), record['format'],
+                        format_level(record['peak']), format_level(record['loudness']), record['waveform'] or '-',
+                        record['status'] or '-', record['target']))
+        else:
+            raise ValueError('unsupported export format: {}'.format(export_format))
+
+    def close(self):
+        self._db.close()
+
+#EOF
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import math, struct
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from core.wavinfo import WAVE_FORMAT_IEEE_FLOAT, RC5_CHANNELS, RC5_SAMPLE_RATE
+from core.copier import FAN_OUT_QUEUE_BYTES, fan_out_blocks, new_digest
+
+# the number of frames decoded, converted and written at a time
+CHUNK_FRAMES = 64 * 1024
+# bump if the conversion changes, so that cached conversions aren't reused
+CONVERSION_VERSION = 2
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def _decode(raw, sample_format, channels):
+    '''
+    Decodes raw little-endian sample data as a (frames, channels) array of
+    float32 values in the range -1.0 to 1.0.
+    '''
+    if sample_format == 'float32':
+        samples = np.frombuffer(raw, dtype='<f4')
+    elif sample_format == 'float64':
+        samples = np.frombuffer(raw, dtype='<f8').astype(np.float32)
+    elif sample_format == 'int16':
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_format == 'int32':
+        samples = ( np.frombuffer(raw, dtype='<i4') / 2147483648.0 ).astype(np.float32)
+    elif sample_format == 'uint8':
+        samples = ( np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0 ) / 128.0
+    elif sample_format == 'int24':
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        # assemble into the top 24 bits then shift down to sign-extend
+        value = ( b[:,0] << 8 | b[:,1] << 16 | b[:,2] << 24 ) >> 8
+        samples = value.astype(np.float32) / 8388608.0
+    else:
+        raise ValueError('unsupported sample format: {}'.format(sample_format))
+    return samples.reshape(-1, channels)
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class SincResampler(object):
+    '''
+    A streaming windowed-sinc resampler. Chunks of input frames are passed
+    to process() in order, each returning the output frames that can be
+    computed from the input so far; flush() returns the remainder. Only the
+    input frames still within reach of the filter are retained between
+    calls.
+
+    Each output frame is the sum of the input frames around its position
+    weighted by a Kaiser-windowed sinc, a low-pass filter whose cutoff lies
+    just below the Nyquist frequency of the lower of the two rates, so that
+    downsampling (e.g., 48kHz to 44.1kHz) doesn't alias what lies above the
+    output's Nyquist frequency back into the audible band, and upsampling
+    doesn't leave images of the input's spectrum above it. The filter spans
+    ZERO_CROSSINGS zero crossings of its sinc either side of the output
+    frame; the input is taken as silent beyond its start and end.
+
+    Output frame k lies at input position k * source_rate / target_rate,
+    computed in integer arithmetic so there's no drift over long files. As
+    that position's fraction takes only target_rate / gcd(source_rate,
+    target_rate) values, the filter weights of each are computed once, and
+    the output frames sharing them are filtered together (a polyphase
+    filter), each a row of a strided view of the input.
+
+    :param source_rate:    the input sample rate
+    :param target_rate:    the output sample rate
+    :param source_frames:  the total number of input frames
+    :param channels:       the number of channels
+    '''
+    # the zero crossings of the sinc either side of the centre of the filter
+    ZERO_CROSSINGS = 64
+    # the cutoff as a fraction of the lower Nyquist frequency, placing the
+    # end of the filter's transition band at about that frequency
+    ROLLOFF        = 0.955
+    # the shape of the Kaiser window, giving a stopband of about -90dB
+    KAISER_BETA    = 9.0
+
+    def __init__(self, source_rate, target_rate, source_frames, channels):
+        self._channels = channels
+        self._src      = source_rate
+        self._dst      = target_rate
+        self._step     = math.gcd(source_rate, target_rate)
+        self._total    = ( source_frames * target_rate + source_rate - 1 ) // source_rate
+        self._next     = 0 # the next output frame
+        # the filter spans more input frames when downsampling, as its cutoff is lower
+        scale          = min(1.0, target_rate / source_rate)
+        self._half     = int(math.ceil(self.ZERO_CROSSINGS / scale))
+        self._taps     = np.arange(1 - self._half, self._half + 1)
+        # the weights of each fraction of an input position, each summing to 1 so DC passes unchanged
+        x = self._taps[np.newaxis, :] - ( np.arange(target_rate // self._step) / ( target_rate // self._step ))[:, np.newaxis]
+        cutoff = scale * self.ROLLOFF
+        window = np.i0(self.KAISER_BETA * np.sqrt(np.clip(1.0 - ( x / self._half ) ** 2, 0.0, None))) / np.i0(self.KAISER_BETA)
+        weights = cutoff * np.sinc(cutoff * x) * window
+        self._weights  = ( weights / weights.sum(axis=1, keepdims=True) ).astype(np.float32)
+        # the retained input, preceded by silence, and the input position of its first frame
+        self._buf      = np.zeros(( self._half - 1, channels ), dtype=np.float32)
+        self._base     = 1 - self._half
+
+    @property
+    def output_frames(self):
+        return self._total
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def process(self, frames):
+        buf = np.concatenate(( self._buf, frames.astype(np.float32, copy=False) ))
+        last = self._base + len(buf) - 1
+        # every output frame whose filter lies within the input so far
+        end = max(self._next, min(( ( last - self._half + 1 ) * self._dst + self._src - 1 ) // self._src, self._total))
+        out = self._filter(buf, self._next, end)
+        self._next = end
+        # keep only the input that the filter of the next output frame reaches
+        first = min(self._next * self._src // self._dst + 1 - self._half, last + 1)
+        self._buf  = buf[first - self._base:]
+        self._base = first
+        return out
+
+    def flush(self):
+        '''
+        Returns any remaining output frames, filtering past the last input
+        frame as silence.
+        '''
+        return self.process(np.zeros(( self._half, self._channels ), dtype=np.float32))
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def _filter(self, buf, start, end):
+        # every 'phases'th output frame has the same weights, its filter 'stride' input frames on from the last
+        phases, stride = self._dst // self._step, self._src // self._step
+        out = np.empty(( end - start, self._channels ), dtype=np.float32)
+        # each channel contiguous, so its strided views are read without copying
+        channels = np.ascontiguousarray(buf.T)
+        for first in range(start, min(start + phases, end)):
+            count = ( end - first + phases - 1 ) // phases
+            weights = self._weights[first * stride % phases]
+            offset = first * stride // phases + 1 - self._half - self._base
+            for channel, samples in enumerate(channels):
+                frames = as_strided(samples[offset:], shape=( count, len(self._taps) ),
+                        strides=( stride * samples.strides[0], samples.strides[0] ), writeable=False)
+                out[first - start::phases, channel] = frames @ weights
+        return out
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def _header(frames):
+    '''
+    Returns the RIFF header of a stereo 44.1kHz float32 WAV file with the
+    given number of frames: an 18 byte fmt chunk, fact chunk and data header.
+    '''
+    block_align = RC5_CHANNELS * 4
+    data_size = frames * block_align
+    if data_size > 0xFFFFFFFF - 58:
+        raise ValueError('converted file would exceed the 4GB WAV limit.')
+    fmt = struct.pack('<HHIIHHH', WAVE_FORMAT_IEEE_FLOAT, RC5_CHANNELS, RC5_SAMPLE_RATE,
+            RC5_SAMPLE_RATE * block_align, block_align, 32, 0)
+    return b'RIFF' + struct.pack('<I', 4 + ( 8 + 18 ) + ( 8 + 4 ) + ( 8 + data_size )) + b'WAVE' \
+            + b'fmt ' + struct.pack('<I', 18) + fmt \
+            + b'fact' + struct.pack('<II', 4, frames) \
+            + b'data' + struct.pack('<I', data_size)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def convert_wav(info, target_files, chunk_frames=CHUNK_FRAMES, gain=None, fsync=False):
+    '''
+    Converts the WAV file described by 'info' to the RC-5's native format
+    (stereo, 44.1kHz, 32 bit float), writing the result to each of the
+    target files as it is converted. The source is processed in chunks of
+    'chunk_frames' frames, so memory use is bounded regardless of its
+    length. Mono sources are copied to both channels; other sample rates
+    are resampled by a SincResampler. If a linear 'gain' is provided
+    the samples are multiplied by it.
+
+    Each converted chunk is queued to a writer thread for each target, as
+    for fan_out_blocks(), so an error writing one target doesn't stop the
+    others. Each target is written to a temporary name and renamed when
+    complete, so an interrupted conversion never leaves a partial file; if
+    'fsync' is True each is synced to the device before it is renamed.
+    Returns the content hash (as hex) of the converted file and the result
+    of each target as for fan_out_blocks(). Raises a ValueError if the
+    source can't be converted.
+
+    :param info:          the WavInfo of the source file
+    :param target_files:  a list of paths to write the converted file to
+    :param chunk_frames:  the number of source frames processed at a time
+    :param gain:          an optional linear gain
+    :param fsync:         if True, sync each target to the device before renaming it
+    '''
+    channels = info.channels
+    resampler = None
+    out_frames = info.frames
+    if info.sample_rate != RC5_SAMPLE_RATE:
+        resampler = SincResampler(info.sample_rate, RC5_SAMPLE_RATE, info.frames, channels)
+        out_frames = resampler.output_frames
+    header = _header(out_frames)
+    state = { 'hash': None }
+    def convert(frames):
+        if channels == 1:
+            frames = np.repeat(frames, RC5_CHANNELS, axis=1)
+        if gain:
+            frames = frames * np.float32(gain)
+        return frames.astype('<f4', copy=False).tobytes()
+    def chunks():
+        digest = new_digest()
+        digest.update(header)
+        yield header
+        with open(info.path, 'rb') as f:
+            f.seek(info.data_offset)
+            remaining = info.frames * info.block_align
+            while remaining > 0:
+                raw = f.read(min(remaining, chunk_frames * info.block_align))
+                if not raw:
+                    raise ValueError('unexpected end of data: {}'.format(info.path))
+                remaining -= len(raw)
+                raw = raw[:len(raw) - len(raw) % info.block_align]
+                frames = _decode(raw, info.sample_format, channels)
+                raw = convert(resampler.process(frames) if resampler else frames)
+                digest.update(raw)
+                yield raw
+        if resampler:
+            raw = convert(resampler.flush())
+            digest.update(raw)
+            yield raw
+        state['hash'] = digest.hexdigest()
+    chunk_bytes = max(1, int(chunk_frames * out_frames / max(1, info.frames))) * RC5_CHANNELS * 4
+    results = fan_out_blocks(chunks(), target_files, len(header) + out_frames * RC5_CHANNELS * 4,
+            max(2, FAN_OUT_QUEUE_BYTES // chunk_bytes), fsync)
+    return state['hash'], results
+
+#EOF
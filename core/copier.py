@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, sys, time, queue, hashlib, threading
+
+COPY_BLOCK_SIZE  = 1024 * 1024
+# the block size of a copy to the RC-5, large so that each write is a long run of clusters
+TRANSFER_BLOCK_SIZE = 8 * 1024 * 1024
+# the ways a file may be copied: through the kernel, or through a buffer (which is what 'auto' uses)
+COPY_METHODS = ( 'auto', 'copy_file_range', 'sendfile', 'buffer' )
+# the fallocate() mode that allocates without changing the file size, the only one FAT supports
+FALLOC_FL_KEEP_SIZE = 0x01
+# the interval between checkpoints of a copy, when requested
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+# the suffix of the temporary file written during a copy
+TMP_SUFFIX = '.tmp'
+# the bytes queued for each target of a fan-out copy, however large its blocks
+FAN_OUT_QUEUE_BYTES = 32 * 1024 * 1024
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def new_digest():
+    '''
+    Returns a new hash object for content hashes. All content hashes in
+    rc5tx are computed this way so they may be compared with one another.
+    '''
+    return hashlib.blake2b(digest_size=16)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def hash_file(path, block_size=COPY_BLOCK_SIZE):
+    '''
+    Returns the content hash (as hex) of the file at 'path'.
+    '''
+    digest = new_digest()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+_fallocate = None
+
+def _preallocate(fd, offset, length):
+    '''
+    Asks the filesystem to allocate 'length' bytes of the file from 'offset'
+    without changing its size, so that a file written to a FAT filesystem
+    is laid out in one contiguous run of clusters and the allocation table
+    is updated once rather than on every write. This is a best effort on
+    Linux, and elsewhere it does nothing. posix_fallocate() isn't used as
+    where the filesystem doesn't support it (as FAT doesn't) the C library
+    falls back to writing zeros, doubling the writes to the device.
+    '''
+    global _fallocate
+    if length <= 0 or not sys.platform.startswith('linux'):
+        return
+    if _fallocate is None:
+        import ctypes
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            _fallocate = getattr(libc, 'fallocate64', None) or libc.fallocate
+            _fallocate.argtypes = [ ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64 ]
+        except (OSError, AttributeError):
+            _fallocate = False
+    if _fallocate:
+        # a failure (e.g., EOPNOTSUPP) only means the file is allocated as it's written
+        _fallocate(fd, FALLOC_FL_KEEP_SIZE, offset, length)
+
+def _copy_times(source_file, target_file):
+    '''
+    Copies the access and modification times of the source file to the
+    target file. Unlike shutil.copystat() this doesn't copy the permission
+    bits, flags or extended attributes, none of which FAT records, saving
+    their writes to the device.
+    '''
+    stat = os.stat(source_file)
+    os.utime(target_file, ns=( stat.st_atime_ns, stat.st_mtime_ns ))
+
+def _kernel_copy(method, fin, fout, position, count):
+    '''
+    Copies up to 'count' bytes of the input file from 'position' to the
+    current position of the output file within the kernel, returning the
+    number of bytes copied.
+    '''
+    if method == 'copy_file_range':
+        return os.copy_file_range(fin, fout, count, position)
+    return os.sendfile(fout, fin, position, count)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def copy_methods(method='auto'):
+    '''
+    Returns the list of copy methods to try in turn for the given method,
+    those this platform lacks left out. The buffer is always last, as the
+    kernel may refuse a copy between some filesystems.
+
+    'auto' is the buffer alone: a copy within the kernel never passes the
+    data through user space, but each block must then be read back to hash
+    it, and bench/copy.py measures that as slower than reading each block
+    once into a buffer to hash and write it. A kernel copy is only tried
+    when chosen.
+    '''
+    if method not in COPY_METHODS:
+        raise ValueError('expected a copy method of {}, not: {}'.format(', '.join(COPY_METHODS), method))
+    methods = [ m for m in COPY_METHODS[1:-1] if method == m and hasattr(os, m) ]
+    return methods + [ 'buffer' ]
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def copy_file(source_file, target_file, block_size=COPY_BLOCK_SIZE, offset=0, checkpoint=None, method='auto', fsync=False):
+    '''
+    Copies the source file and its modification time to the target file,
+    while computing the content hash of the bytes copied. Returns the
+    content hash (as hex).
+
+    The 'method' is one of COPY_METHODS. With os.copy_file_range() or
+    os.sendfile() each block is copied within the kernel and then hashed
+    from the page cache the copy has just filled, so the data is never
+    written from a user-space buffer; otherwise (or if the kernel refuses
+    the copy, e.g., between some filesystems) each block is read into a
+    buffer of 'block_size' bytes, hashed and written until all of it has
+    been. 'auto' uses the buffer, as for copy_methods(). The target is preallocated where the filesystem
+    supports it, and if 'fsync' is True synced to the device before it is
+    renamed into place.
+
+    The copy is written to a temporary file alongside the target and renamed
+    into place once complete, so the target is never left partially written.
+    If a 'checkpoint' function is provided, every CHECKPOINT_BYTES the
+    temporary file is synced to the device and the function called with the
+    number of bytes written. A copy interrupted after a checkpoint may be
+    resumed by passing that number as the 'offset': the bytes already
+    written are hashed from the source but not copied again.
+    '''
+    methods = copy_methods(method)
+    tmp_file = target_file + TMP_SUFFIX
+    if offset > 0 and ( not os.path.isfile(tmp_file) or os.path.getsize(tmp_file) < offset ):
+        offset = 0
+    digest = new_digest()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(source_file, 'rb', buffering=0) as fin, open(tmp_file, 'r+b' if offset else 'wb', buffering=0) as fout:
+        remaining = offset
+        while remaining > 0:
+            n = fin.readinto(view[:min(block_size, remaining)])
+            if not n:
+                raise ValueError('source is shorter than the resume offset: {}'.format(source_file))
+            digest.update(view[:n])
+            remaining -= n
+        fout.seek(offset)
+        fout.truncate()
+        _preallocate(fout.fileno(), offset, os.fstat(fin.fileno()).st_size - offset)
+        written = offset
+        next_checkpoint = offset + CHECKPOINT_BYTES
+        while True:
+            if methods[0] == 'buffer':
+                n = fin.readinto(buf)
+                if not n:
+                    break
+                # the target is unbuffered, so a write may be short (e.g., interrupted by a signal)
+                done = 0
+                while done < n:
+                    done += fout.write(view[done:n])
+            else:
+                try:
+                    n = _kernel_copy(methods[0], fin.fileno(), fout.fileno(), written, block_size)
+                except OSError:
+                    # refused (e.g., EXDEV, EINVAL): nothing was copied, so try the next method
+                    methods.pop(0)
+                    continue
+                if not n:
+                    # a filesystem may copy nothing rather than refuse, so the buffer confirms the end
+                    methods = [ 'buffer' ]
+                    continue
+                # the source position follows the hashing, the target's the copy
+                copied, n = n, 0
+                while n < copied:
+                    read = fin.readinto(view[n:copied])
+                    if not read:
+                        raise ValueError('source changed during the copy: {}'.format(source_file))
+                    n += read
+            digest.update(view[:n])
+            written += n
+            if checkpoint and written >= next_checkpoint:
+                os.fsync(fout.fileno())
+                checkpoint(written)
+                next_checkpoint = written + CHECKPOINT_BYTES
+        if fsync:
+            os.fsync(fout.fileno())
+    _copy_times(source_file, tmp_file)
+    os.replace(tmp_file, target_file)
+    return digest.hexdigest()
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def flush_files(paths):
+    '''
+    Syncs each of the files and the directories containing them to the
+    device, so that files written without a sync of their own are all
+    flushed together at the end of a transfer. Missing files are ignored.
+    '''
+    directories = set()
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(os.path.dirname(os.path.abspath(path)))
+    for directory in sorted(directories):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            # a directory can't be opened for syncing on some platforms
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def fan_out_blocks(blocks, target_files, size=0, queue_blocks=2, fsync=False, finish=None):
+    '''
+    Writes each of the blocks of bytes yielded by 'blocks' to each of the
+    target files, consuming it only once. Each target file is written on its
+    own thread from its own queue of up to 'queue_blocks' blocks, so a slow
+    target only holds back the others once its queue is full, and an error
+    writing one target doesn't stop the others.
+
+    Each target is preallocated 'size' bytes and written to a temporary
+    file. Once every block has been written it is synced to the device if
+    'fsync' is True, passed with its result to the 'finish' function (if
+    provided) on its thread, then renamed into place. If 'blocks' raises an
+    exception the targets are abandoned and the exception is raised.
+
+    Returns a dictionary of each target file to a dictionary of its 'error'
+    (an OSError, or None) and the 'seconds' and 'bytes' of its write.
+    '''
+    results = { target_file: { 'error': None, 'seconds': 0.0, 'bytes': 0 } for target_file in target_files }
+    queues  = { target_file: queue.Queue(maxsize=queue_blocks) for target_file in target_files }
+    state   = { 'complete': False }
+    def write(target_file):
+        result = results[target_file]
+        target_queue = queues[target_file]
+        tmp_file = target_file + TMP_SUFFIX
+        start = time.perf_counter()
+        fout = None
+        try:
+            fout = open(tmp_file, 'wb')
+            _preallocate(fout.fileno(), 0, size)
+        except OSError as e:
+            result['error'] = e
+        # the queue is drained even after an error, so the reader never blocks on it
+        while True:
+            block = target_queue.get()
+            if block is None:
+                break
+            if result['error'] is None:
+                try:
+                    fout.write(block)
+                    result['bytes'] += len(block)
+                except OSError as e:
+                    result['error'] = e
+        try:
+            if fout:
+                if fsync and result['error'] is None and state['complete']:
+                    fout.flush()
+                    os.fsync(fout.fileno())
+                fout.close()
+            if result['error'] is None and state['complete']:
+                if finish:
+                    finish(tmp_file, result)
+                os.replace(tmp_file, target_file)
+                result['seconds'] = time.perf_counter() - start
+            elif os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        except OSError as e:
+            result['error'] = e
+    threads = [ threading.Thread(target=write, args=( target_file, ), name='fan-out-{}'.format(i))
+            for i, target_file in enumerate(target_files) ]
+    for thread in threads:
+        thread.start()
+    try:
+        for block in blocks:
+            for target_queue in queues.values():
+                target_queue.put(block)
+        state['complete'] = True
+    finally:
+        # if the blocks couldn't be produced the targets are abandoned
+        for target_queue in queues.values():
+            target_queue.put(None)
+        for thread in threads:
+            thread.join()
+    return results
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def fan_out_file(source_file, target_files, block_size=COPY_BLOCK_SIZE, verify=False, queue_blocks=None, fsync=False, workers=None):
+    '''
+    Copies the source file to each of the target files as copy_file() does
+    through a buffer, reading the source only once, each target written on
+    its own thread as for fan_out_blocks() from a queue of up to
+    'queue_blocks' blocks (by default, FAN_OUT_QUEUE_BYTES of them). If
+    'fsync' is True each target is synced to the device before it is
+    renamed into place. If 'verify' is True each thread then reads back its
+    target to confirm its content hash. No more than 'workers' targets (if
+    provided) are written at once; any more are written in turn, the source
+    being read once for each group.
+
+    Returns the content hash (as hex) and a dictionary of each target file
+    to a dictionary of its 'error' (an OSError, or None), whether it was
+    'verified' (True, False, or None if not verified), and the 'seconds'
+    and 'bytes' of its write.
+    '''
+    if workers and len(target_files) > workers:
+        results = {}
+        for i in range(0, len(target_files), workers):
+            content_hash, group = fan_out_file(source_file, target_files[i:i+workers], block_size, verify, queue_blocks, fsync)
+            results.update(group)
+        return content_hash, results
+    state = { 'hash': None }
+    def read():
+        digest = new_digest()
+        with open(source_file, 'rb') as fin:
+            while True:
+                # a new block each time, since it's shared by the queues
+                block = fin.read(block_size)
+                if not block:
+                    break
+                digest.update(block)
+                yield block
+        state['hash'] = digest.hexdigest()
+    def finish(tmp_file, result):
+        _copy_times(source_file, tmp_file)
+        if verify:
+            result['verified'] = verify_file(tmp_file, state['hash'], block_size)
+    results = fan_out_blocks(read(), target_files, os.path.getsize(source_file),
+            queue_blocks or max(2, FAN_OUT_QUEUE_BYTES // block_size), fsync, finish)
+    for result in results.values():
+        result.setdefault('verified', None)
+    return state['hash'], results
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def _uncached(fd):
+    '''
+    Flushes the file to the device then asks the OS not to serve reads of
+    it from the page cache, so that a read-back reads what's on the device.
+    This is a best effort: Linux drops the cached pages, macOS disables
+    caching for the descriptor, and elsewhere it does nothing.
+    '''
+    os.fsync(fd)
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    else:
+        try:
+            import fcntl
+            if hasattr(fcntl, 'F_NOCACHE'):
+                fcntl.fcntl(fd, fcntl.F_NOCACHE, 1)
+        except ImportError:
+            pass
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def verify_file(target_file, content_hash, block_size=COPY_BLOCK_SIZE):
+    '''
+    Reads back the target file, bypassing the page cache where possible,
+    and returns True if its content hash matches the one provided.
+    '''
+    digest = new_digest()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(target_file, 'rb') as f:
+        _uncached(f.fileno())
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest() == content_hash
+
+#EOF
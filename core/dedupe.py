@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+from concurrent.futures import ThreadPoolExecutor
+
+from core.copier import COPY_BLOCK_SIZE, new_digest
+
+# the number of bytes of sample data compared before the whole of it
+HEAD_BYTES = 64 * 1024
+# the number of threads used to hash candidate files
+HASH_WORKERS = 4
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def audio_key(info):
+    '''
+    Returns a key that is the same for any two files that could hold the
+    same audio: their sample format, channels, sample rate and the size of
+    their sample data, all known from the header alone.
+    '''
+    return ( info.sample_format, info.channels, info.sample_rate, info.data_size )
+
+def hash_audio(info, limit=None, block_size=COPY_BLOCK_SIZE):
+    '''
+    Returns the content hash (as hex) of the sample data of the file, or of
+    its first 'limit' bytes. The rest of the file (the header, and chunks
+    such as metadata written by one application but not another) is not
+    included, so files differing only in those have the same hash.
+    '''
+    digest = new_digest()
+    remaining = info.data_size if limit is None else min(limit, info.data_size)
+    buf = bytearray(min(block_size, max(1, remaining)))
+    view = memoryview(buf)
+    with open(info.path, 'rb') as f:
+        f.seek(info.data_offset)
+        while remaining > 0:
+            n = f.readinto(view[:min(len(buf), remaining)])
+            if not n:
+                break
+            digest.update(view[:n])
+            remaining -= n
+    return digest.hexdigest()
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def _split(groups, fingerprint, executor):
+    '''
+    Splits each group of (file, info) pairs by the fingerprint of its
+    members, returning only the groups that still have more than one.
+    '''
+    result = []
+    for group in groups:
+        fingerprints = executor.map(lambda pair: fingerprint(pair[1]), group)
+        split = {}
+        for pair, value in zip(group, fingerprints):
+            split.setdefault(value, []).append(pair)
+        result.extend(g for g in split.values() if len(g) > 1)
+    return result
+
+def find_duplicates(files, hash_workers=HASH_WORKERS):
+    '''
+    Returns the groups of files whose audio is identical, each as a list of
+    files in the order given, so that the first of each group is the one to
+    keep. 'files' is a list of (file, WavInfo) pairs.
+
+    Files are grouped first by their header, which costs nothing more to
+    read, then within each group by a hash of the start of their sample
+    data, and only then by a hash of the whole of it, so most files are
+    never read at all.
+    '''
+    groups = {}
+    for pair in files:
+        groups.setdefault(audio_key(pair[1]), []).append(pair)
+    candidates = [ group for group in groups.values() if len(group) > 1 ]
+    if not candidates:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, hash_workers), thread_name_prefix='dedupe') as executor:
+        candidates = _split(candidates, lambda info: hash_audio(info, HEAD_BYTES), executor)
+        # files no larger than the head are already known to be identical
+        candidates = _split(candidates, lambda info: hash_audio(info) if info.data_size > HEAD_BYTES else None, executor)
+    return [ [ pair[0] for pair in group ] for group in candidates ]
+
+#EOF
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, time, asyncio, inspect, functools, threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.logger import Logger, Level
+from core.journal import Journal
+from core.manifest import Manifest
+from core.cache import cache_directory
+from core.planner import TransferPlan, ThroughputHistory
+from core.trace import Trace, WRITE_PHASES
+from core.catalog import Catalog
+from core.copier import COPY_METHODS, TRANSFER_BLOCK_SIZE, flush_files
+from core.transfer import (PROBE_WORKERS, MAX_MEMORIES, UNCHANGED, count_files, scan_source, analyse_levels,
+        assign_source_files, clean_target_directory, transfer_files, fan_out_files, sync_files,
+        get_catalog_records, add_waveforms)
+
+# the throughput history, in the 'stats' cache directory
+THROUGHPUT_FILENAME = 'throughput.json'
+# file operations that are always completed once begun: a reorder of memories
+# stops only once the target matches its manifest
+UNINTERRUPTIBLE = ( 'rename', )
+# when the files written are synced to the device: as each is written, or together once all are
+FSYNC_MODES = ( 'file', 'end' )
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class TransferError(Exception):
+    '''
+    Raised when a transfer can't proceed, e.g., a directory is missing or
+    there are too many source files.
+    '''
+    pass
+
+class TransferCancelled(Exception):
+    '''
+    Raised on a worker thread at its next file operation once the transfer
+    has been cancelled.
+    '''
+    pass
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class EngineTrace(Trace):
+    '''
+    A Trace that also reports each phase and file operation to its engine
+    as it happens, and stops the transfer at the next file operation once
+    the engine has been cancelled. Since every blocking operation already
+    records itself in the Trace it's given, this is how progress and
+    cancellation reach them without any further arguments.
+    '''
+    def __init__(self, engine):
+        super().__init__()
+        self._engine = engine
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @contextmanager
+    def phase(self, name):
+        self._engine._phase_event(name, 'start')
+        try:
+            with super().phase(name):
+                yield
+        finally:
+            self._engine._phase_event(name, 'end')
+
+    @contextmanager
+    def file(self, phase, path):
+        if phase not in UNINTERRUPTIBLE:
+            self._engine._check_cancelled()
+        with super().file(phase, path) as event:
+            yield event
+        self._engine._file_event(event)
+
+    def add(self, phase, path, seconds, nbytes=0):
+        event = super().add(phase, path, seconds, nbytes)
+        self._engine._file_event(event)
+        return event
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class TransferEngine(object):
+    '''
+    Transfers WAV files from a source directory to one or more WAVE
+    directories of the RC-5, as a series of asyncio coroutines:
+
+        scan()      find, check and assign memories to the source files
+        plan()      check the transfer against the limits of each target
+        clean()     delete the WAV files on each target
+        transfer()  copy, convert or sync the memories of each target
+        catalog()   list the memories written, adding them to the catalog database
+
+    to be awaited in that order (or all at once with run()). The file I/O
+    of each runs on a pool of worker threads, no more than 'concurrency'
+    operations at a time (e.g., cleaning several targets), so the event
+    loop is never blocked. 'concurrency' also bounds the threads checking,
+    hashing and probing the source files, the processes analysing them,
+    and the targets written at once by a transfer to several targets,
+    which reads each source file once for each such group.
+
+    With 'dry_run' each target is left unmodified: the files that would be
+    written, moved or deleted are only listed, no journal or manifest is
+    written, and no run is added to the catalog database.
+
+    If a 'progress' function is provided it is called on the event loop
+    with a dictionary for each event: the 'event' ('start' or 'end' of a
+    phase, or 'file' once an operation on a file completes), the 'phase'
+    (e.g., 'scan', 'copy'), the 'file' and its 'bytes', and the total bytes
+    'written' to the targets so far and the 'total' expected once planned.
+
+    Each file is copied with the given 'copy_method' (one of COPY_METHODS)
+    in blocks of 'block_size' bytes. By default the files written are left
+    for the OS to flush to the device; with an 'fsync' of 'file' each is
+    synced as it's written, so an interruption loses at most the file being
+    written, and with 'end' they're all synced together once the transfer
+    is complete, which lets the device write them in longer runs.
+
+    A transfer is cancelled by cancel(), or by cancelling the task awaiting
+    it: the worker stops before its next file operation (a file being
+    copied is completed, never left partially written) and the coroutine
+    raises asyncio.CancelledError. A cancelled transfer may be resumed.
+
+    :param source:        the source directory
+    :param targets:       the list of target (WAVE) directories
+    :param log:           the optional Logger to report to
+    :param sync:          if True, write only the memories changed since the last sync
+    :param verify:        if True, read back each file written to confirm it matches its source
+    :param resume:        if True, resume an interrupted transfer
+    :param index_file:    the optional path of a cache of the source directory listings
+    :param dedupe:        if True, skip files duplicating earlier files; if 'report', only report them
+    :param analyse:       if True, measure the levels of each file
+    :param normalise:     the optional loudness in LUFS to which each file is normalised
+    :param waveform:      if True, add a waveform sparkline to the catalog of each file
+    :param playlist:      the optional path of a playlist file ordering the memories
+    :param pins:          the optional memories of files, as 'MEMORY:NAME,...'
+    :param catalog_file:  the optional path of the catalog database
+    :param concurrency:   the maximum number of concurrent file operations
+    :param copy_method:   how each file is copied, one of COPY_METHODS
+    :param block_size:    the size in bytes of each block copied
+    :param fsync:         when the files written are synced to the device, one of FSYNC_MODES, or None
+    :param progress:      the optional function called with each progress event
+    :param allow_missing: if True, a target needn't exist yet (e.g., the RC-5 isn't mounted)
+    :param dry_run:       if True, list rather than write, move or delete the files on each target
+    '''
+    def __init__(self, source, targets, log=None, sync=False, verify=False, resume=False, index_file=None, dedupe=None,
+            analyse=False, normalise=None, waveform=False, playlist=None, pins=None, catalog_file=None,
+            concurrency=PROBE_WORKERS, copy_method='auto', block_size=TRANSFER_BLOCK_SIZE, fsync=None, progress=None,
+            allow_missing=False, dry_run=False):
+        self._log          = log or Logger('engine', level=Level.INFO)
+        self._source       = Path(source)
+        self._targets      = [ Path(target) for target in targets ]
+        self._sync         = sync
+        self._verify       = verify
+        self._resume       = resume and not sync
+        self._index_file   = index_file
+        self._dedupe       = dedupe
+        self._analyse      = analyse
+        self._normalise    = normalise
+        self._waveform     = waveform
+        self._playlist     = playlist
+        self._pins         = pins
+        self._catalog_file = catalog_file
+        self._concurrency  = max(1, concurrency)
+        self._copy_method  = copy_method
+        self._block_size   = block_size
+        self._fsync        = fsync
+        self._progress     = progress
+        self._dry_run      = dry_run
+        self._validate(allow_missing)
+        self._executor     = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix='engine')
+        self._semaphore    = asyncio.Semaphore(self._concurrency)
+        self._cancelled    = threading.Event()
+        self._loop         = None
+        self._lock         = threading.Lock()
+        self._history      = ThroughputHistory(os.path.join(cache_directory('stats'), THROUGHPUT_FILENAME))
+        self._reset()
+
+    def _reset(self):
+        self._trace        = EngineTrace(self)
+        self._written      = 0
+        self._total        = None
+        self._source_files = []
+        self._infos        = {}
+        self._conversions  = {}
+        self._levels       = None
+        self._gains        = None
+        self._journals     = {}
+        self._plans        = {}
+        self._catalogs     = {}
+        self._records      = {}
+        self._runs         = {}
+        self._started      = None
+
+    def _validate(self, allow_missing):
+        '''
+        Raises a TransferError unless the source is a directory, each target
+        a distinct directory named 'WAVE', and the copy options are valid.
+        '''
+        if not self._source.exists():
+            raise TransferError('source directory does not exist: {}'.format(self._source))
+        if not self._source.is_dir():
+            raise TransferError('source argument is not a directory: {}'.format(self._source))
+        if not self._targets:
+            raise TransferError('expected at least one target directory.')
+        for i, target in enumerate(self._targets):
+            if target.exists():
+                if not target.is_dir():
+                    raise TransferError('target argument is not a directory: {}'.format(target))
+            elif not allow_missing:
+                raise TransferError('target directory does not exist: {} (is the RC-5 mounted as a USB device?)'.format(target))
+            if target == self._source:
+                raise TransferError('source and target directory are the same: {}'.format(target))
+            if os.path.basename(os.path.normpath(target)) != 'WAVE':
+                raise TransferError('expected target directory to be named "WAVE", not: {}'.format(
+                        os.path.basename(os.path.normpath(target))))
+            if target in self._targets[:i]:
+                raise TransferError('target directory given more than once: {}'.format(target))
+        # a sync or resume depends on the state of a single target
+        if len(self._targets) > 1 and ( self._sync or self._resume ):
+            raise TransferError('a sync or resumed transfer may only be made to a single target.')
+        if self._copy_method not in COPY_METHODS:
+            raise TransferError('expected a copy method of {}, not: {}'.format(', '.join(COPY_METHODS), self._copy_method))
+        if self._block_size < 1:
+            raise TransferError('expected a positive block size, not: {}'.format(self._block_size))
+        if self._fsync is not None and self._fsync not in FSYNC_MODES:
+            raise TransferError('expected an fsync mode of {}, not: {}'.format(', '.join(FSYNC_MODES), self._fsync))
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def targets(self):
+        return list(self._targets)
+
+    @property
+    def sync(self):
+        return self._sync
+
+    @property
+    def resume(self):
+        '''
+        True if resuming an interrupted transfer, once planned, since there
+        may turn out to be nothing to resume.
+        '''
+        return self._resume
+
+    @property
+    def trace(self):
+        '''
+        The Trace of the current transfer, begun by scan().
+        '''
+        return self._trace
+
+    @property
+    def source_files(self):
+        '''
+        The source files by memory, with None for any empty memory.
+        '''
+        return list(self._source_files)
+
+    @property
+    def infos(self):
+        '''
+        The dictionary of each source file to its WavInfo.
+        '''
+        return self._infos
+
+    @property
+    def plans(self):
+        '''
+        The dictionary of each target to its TransferPlan.
+        '''
+        return self._plans
+
+    @property
+    def catalogs(self):
+        '''
+        The dictionary of each target to the catalog of its transfer, as
+        returned by transfer_files().
+        '''
+        return self._catalogs
+
+    @property
+    def runs(self):
+        '''
+        The dictionary of each target to its run in the catalog database.
+        '''
+        return self._runs
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def cancel(self):
+        '''
+        Cancels the transfer, which stops before its next file operation.
+        This may be called from any thread, e.g., a signal handler.
+        '''
+        self._cancelled.set()
+
+    def _check_cancelled(self):
+        if self._cancelled.is_set():
+            raise TransferCancelled()
+
+    def _check_cancelled_async(self):
+        if self._cancelled.is_set():
+            raise asyncio.CancelledError()
+
+    def _emit(self, event):
+        '''
+        Calls the progress function with the event on the event loop, from
+        whichever thread the event happened on.
+        '''
+        if self._progress is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._progress, event)
+
+    def _phase_event(self, name, state):
+        self._emit({ 'event': state, 'phase': name, 'file': None, 'bytes': 0,
+                'written': self._written, 'total': self._total })
+
+    def _file_event(self, event):
+        with self._lock:
+            if event['phase'] in WRITE_PHASES:
+                self._written += event['bytes']
+            written = self._written
+        self._emit({ 'event': 'file', 'phase': event['phase'], 'file': event['file'], 'bytes': event['bytes'],
+                'written': written, 'total': self._total })
+
+    async def _run(self, function, *args, **kwargs):
+        '''
+        Runs the blocking function on the engine's worker threads, returning
+        its result once complete. If the awaiting task is cancelled the
+        worker is cancelled too, and waited for so that nothing is still
+        writing to the target once this returns.
+        '''
+        self._check_cancelled_async()
+        self._loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            future = self._loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                self._cancelled.set()
+                await asyncio.wait([ future ])
+                if not future.cancelled():
+                    future.exception() # retrieved, since it's expected to be TransferCancelled
+                raise
+            except TransferCancelled:
+                raise asyncio.CancelledError()
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    async def scan(self):
+        '''
+        Finds the WAV files in the source directory tree, checking their
+        format, then optionally skips duplicates, analyses their levels and
+        assigns them memories in the order of the playlist and pins. Begins
+        a new Trace. Returns the source files by memory, with None for any
+        empty memory, or raises a TransferError.
+        '''
+        self._reset()
+        scanned = await self._run(scan_source, self._log, self._source, self._index_file, self._dedupe, self._trace,
+                self._concurrency)
+        if scanned is None:
+            raise TransferError('too many source files (more than {})'.format(MAX_MEMORIES))
+        self._source_files, self._infos, self._conversions = scanned
+        if self._analyse or self._normalise is not None:
+            self._levels, self._conversions, self._gains = await self._run(analyse_levels, self._log,
+                    self._source_files, self._infos, self._conversions, self._normalise, self._trace, self._concurrency)
+        assigned = await self._run(assign_source_files, self._log, self._source, self._source_files, self._playlist, self._pins)
+        if assigned is None:
+            raise TransferError('memories could not be assigned.')
+        self._source_files = assigned
+        return self.source_files
+
+    async def plan(self):
+        '''
+        Checks for an interrupted transfer on each target, then totals the
+        sizes and durations of the source files and checks them against the
+        limits of the RC-5 and the space on each target. Returns a dictionary
+        of each target to its TransferPlan, whose problems() should be empty
+        before continuing.
+        '''
+        self._journals = await self._run(lambda: { target: Journal(target) for target in self._targets })
+        journal = self._journals[self._targets[0]]
+        if self._resume and not journal.found:
+            self._log.warning('no interrupted transfer found on the target, starting a new transfer.')
+            self._resume = False
+        elif self._resume:
+            self._log.info('resuming interrupted transfer: {} memories already completed.'.format(journal.completed_count))
+        elif not self._sync:
+            for target, target_journal in self._journals.items():
+                if target_journal.found:
+                    self._log.warning('found an interrupted transfer on the target; use --resume to continue it: {}'.format(target))
+        infos = [ self._infos[f] for f in self._source_files if f ]
+        plans = await asyncio.gather(*( self._run(TransferPlan, infos, target, self._history) for target in self._targets ))
+        self._plans = dict(zip(self._targets, plans))
+        self._total = sum(plan.total_bytes for plan in plans)
+        return self._plans
+
+    async def clean(self, confirm=None):
+        '''
+        Deletes the WAV files on each target, unless syncing or resuming,
+        which leave the target as it is. If a 'confirm' function (or
+        coroutine function) is provided, it is called with the target and
+        the number of files to be deleted, and the files are deleted only
+        if it returns True. Returns False if a file could not be deleted.
+        '''
+        if self._sync or self._resume:
+            return True
+        loop = asyncio.get_running_loop()
+        confirm_lock = asyncio.Lock()
+        async def ask(target, count):
+            # one question at a time, however many targets are being cleaned
+            async with confirm_lock:
+                answer = confirm(target, count)
+                return await answer if inspect.isawaitable(answer) else answer
+        def confirmer(target):
+            if confirm is None:
+                return None
+            # called on the worker thread, which waits for the answer from the event loop
+            return lambda count: asyncio.run_coroutine_threadsafe(ask(target, count), loop).result()
+        with self._trace.phase('clean'):
+            results = await asyncio.gather(*( self._run(clean_target_directory, self._log, target, confirmer(target), self._trace,
+                    self._dry_run) for target in self._targets ))
+        return all(results)
+
+    async def transfer(self):
+        '''
+        Copies or converts the source files to the memories of each target,
+        or if syncing writes only those that have changed, recording the
+        throughput of each target. Returns a dictionary of each target to
+        the catalog of its transfer.
+        '''
+        self._started = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        with self._trace.phase('transfer'):
+            self._catalogs = await self._run(self._transfer)
+        return self._catalogs
+
+    def _transfer(self):
+        tstart = time.monotonic()
+        copy_options = { 'method': self._copy_method, 'block_size': self._block_size, 'fsync': self._fsync == 'file' }
+        if self._sync:
+            catalogs = { self._targets[0]: sync_files(self._log, self._source, self._source_files, self._targets[0],
+                    probe_workers=self._concurrency, conversions=self._conversions, verify=self._verify, gains=self._gains,
+                    trace=self._trace, copy_options=copy_options, dry_run=self._dry_run) }
+        else:
+            if not self._resume and not self._dry_run:
+                for journal in self._journals.values():
+                    journal.start()
+            if len(self._targets) == 1:
+                catalogs = { self._targets[0]: transfer_files(self._log, self._source, self._source_files, self._targets[0],
+                        probe_workers=self._concurrency, conversions=self._conversions, verify=self._verify,
+                        journal=self._journals[self._targets[0]], gains=self._gains, trace=self._trace,
+                        copy_options=copy_options, dry_run=self._dry_run) }
+            else:
+                # each source file is read once and written to every target
+                catalogs = fan_out_files(self._log, self._source, self._source_files, self._targets,
+                        probe_workers=self._concurrency, conversions=self._conversions, verify=self._verify,
+                        journals=self._journals, gains=self._gains, trace=self._trace, copy_options=copy_options,
+                        dry_run=self._dry_run)
+        if self._dry_run:
+            return catalogs
+        if not self._sync:
+            for target in self._targets:
+                if len(catalogs[target]) == count_files(self._source_files):
+                    self._journals[target].finish()
+                # a full transfer leaves any previous sync manifest stale
+                Manifest(target).delete()
+        if self._fsync == 'end':
+            with self._trace.phase('flush'):
+                self._log.info('syncing files written to the device…')
+                flush_files([ info[1] for catalog in catalogs.values() for info in catalog.values() if info[3] != UNCHANGED ])
+        elapsed = time.monotonic() - tstart
+        if not self._resume:
+            for target, catalog in catalogs.items():
+                # record the throughput of the files actually written
+                self._history.record(target, sum(self._plans[target].size(self._source_files[int(memory)-1])
+                        for memory, info in catalog.items() if info[3] != UNCHANGED), elapsed)
+        return catalogs
+
+    async def catalog(self, kind=None):
+        '''
+        Returns a dictionary of each target to the catalog records of the
+        memories written to it, with their waveforms if requested, and adds
+        each as a run of the given 'kind' (by default 'sync', 'resume' or
+        'transfer') to the catalog database, if one was provided and this
+        isn't a dry run.
+        '''
+        kind = kind or ( 'sync' if self._sync else 'resume' if self._resume else 'transfer' )
+        with self._trace.phase('catalog'):
+            self._records = {}
+            for target in self._targets:
+                records = get_catalog_records(self._catalogs.get(target, {}), self._source_files, self._infos,
+                        self._plans[target].size, self._levels)
+                if self._waveform:
+                    await self._run(add_waveforms, self._log, records, self._infos, self._trace)
+                self._records[target] = records
+            if self._catalog_file and not self._dry_run:
+                self._runs = await self._run(self._add_runs, kind)
+        return self._records
+
+    def _add_runs(self, kind):
+        catalog_db = Catalog(self._catalog_file)
+        try:
+            return { target: catalog_db.add_run(self._started, kind, self._source, target, records)
+                    for target, records in self._records.items() }
+        finally:
+            catalog_db.close()
+
+    async def run(self, confirm=None):
+        '''
+        Performs the whole transfer: scans, plans, cleans (with 'confirm' as
+        for clean()), transfers and catalogs, returning the catalog records
+        of each target. Raises a TransferError if the plan has problems or
+        the target could not be cleaned.
+        '''
+        await self.scan()
+        plans = await self.plan()
+        problems = [ problem for plan in plans.values() for problem in plan.problems() ]
+        if problems:
+            raise TransferError('; '.join(problems))
+        if not await self.clean(confirm):
+            raise TransferError('clean target directory failed.')
+        await self.transfer()
+        return await self.catalog()
+
+    def close(self):
+        '''
+        Shuts down the engine's worker threads.
+        '''
+        self._executor.shutdown(wait=True)
+
+#EOF
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import numpy as np
+
+from core.convert import CHUNK_FRAMES, _decode
+
+# the number of points of an envelope, one for each character of its sparkline
+ENVELOPE_POINTS  = 32
+# bump if the envelope changes, so that cached envelopes aren't reused
+ENVELOPE_VERSION = 1
+# the characters of a sparkline, from quietest to loudest
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def compute_envelope(info, points=ENVELOPE_POINTS, chunk_frames=CHUNK_FRAMES):
+    '''
+    Returns the min/max envelope of the WAV file described by 'info', as a
+    list of 'points' [min, max] pairs, each the lowest and highest sample
+    of any channel over an equal share of the file. The file is read once,
+    in chunks of 'chunk_frames' frames, so memory use is bounded regardless
+    of its length.
+    '''
+    total = info.frames
+    lows  = np.zeros(points, dtype=np.float32)
+    highs = np.zeros(points, dtype=np.float32)
+    if total == 0:
+        return [ [ 0.0, 0.0 ] for _ in range(points) ]
+    start = 0
+    with open(info.path, 'rb') as f:
+        f.seek(info.data_offset)
+        while start < total:
+            raw = f.read(min(total - start, chunk_frames) * info.block_align)
+            raw = raw[:len(raw) - len(raw) % info.block_align]
+            if not raw:
+                break
+            frames = _decode(raw, info.sample_format, info.channels)
+            # the point of each frame, and where each run of frames of the same point begins
+            point = ( np.arange(start, start + len(frames), dtype=np.int64) * points ) // total
+            runs = np.concatenate(( [ 0 ], np.flatnonzero(np.diff(point)) + 1 ))
+            low  = np.minimum.reduceat(frames.min(axis=1), runs)
+            high = np.maximum.reduceat(frames.max(axis=1), runs)
+            np.minimum.at(lows, point[runs], low)
+            np.maximum.at(highs, point[runs], high)
+            start += len(frames)
+    return [ [ round(float(low), 4), round(float(high), 4) ] for low, high in zip(lows, highs) ]
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def sparkline(envelope):
+    '''
+    Returns the envelope as a line of block characters, one for each point,
+    its height the point's amplitude relative to the loudest, so that the
+    shape of quiet files is as visible as that of loud ones.
+    '''
+    amplitudes = [ max(-low, high) for low, high in envelope ]
+    peak = max(amplitudes) if amplitudes else 0.0
+    if peak <= 0.0:
+        return SPARK_CHARS[0] * len(amplitudes)
+    top = len(SPARK_CHARS) - 1
+    return ''.join(SPARK_CHARS[min(top, int(amplitude / peak * top + 0.5))] for amplitude in amplitudes)
+
+#EOF
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, json
+
+JOURNAL_FILENAME = '.rc5tx-journal.json'
+JOURNAL_VERSION  = 1
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class Journal(object):
+    '''
+    A record of the progress of a transfer, stored as a JSON file in the
+    target (WAVE) directory and rewritten (atomically) as each memory is
+    completed and at each checkpoint within a large file. If a transfer is
+    interrupted the journal records which memories were completed and how
+    far the copy of the next had got, so that it may be resumed.
+
+    Memories are identified with their source by name, size and mtime, so
+    a source file that has changed since it was journaled is copied again.
+
+    :param target:  the target (WAVE) directory
+    '''
+    def __init__(self, target):
+        self._path      = os.path.join(target, JOURNAL_FILENAME)
+        self._memories  = {}
+        self._partial   = None
+        self._found     = False
+        if os.path.isfile(self._path):
+            try:
+                with open(self._path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == JOURNAL_VERSION:
+                    self._memories = data.get('memories', {})
+                    self._partial  = data.get('partial')
+                    self._found    = True
+            except ValueError:
+                pass # a corrupt journal is treated as absent
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def found(self):
+        '''
+        Return True if a journal from an earlier, unfinished transfer was found.
+        '''
+        return self._found
+
+    @property
+    def completed_count(self):
+        return len(self._memories)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @staticmethod
+    def _identity(source_file, stat):
+        return {
+            'source': os.path.basename(source_file),
+            'size':   stat.st_size,
+            'mtime':  stat.st_mtime_ns
+        }
+
+    @staticmethod
+    def _matches(entry, identity):
+        return entry is not None and all(entry.get(k) == v for k, v in identity.items())
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def completed(self, memory, source_file, stat):
+        '''
+        Returns the journal entry (including 'hash' and 'status') if the
+        memory was completed from the same source file, otherwise None.
+        '''
+        entry = self._memories.get(memory)
+        return entry if self._matches(entry, self._identity(source_file, stat)) else None
+
+    def resume_offset(self, memory, source_file, stat):
+        '''
+        Returns the byte offset to which the temporary file of the memory was
+        checkpointed from the same source file, otherwise 0.
+        '''
+        if self._partial and self._partial.get('memory') == memory \
+                and self._matches(self._partial, self._identity(source_file, stat)):
+            return self._partial['offset']
+        return 0
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def start(self):
+        '''
+        Starts a new journal, discarding any earlier one.
+        '''
+        self._memories = {}
+        self._partial  = None
+        self._save()
+
+    def checkpoint(self, memory, source_file, stat, offset):
+        '''
+        Records that the temporary file of the memory has been durably
+        written up to 'offset' bytes.
+        '''
+        self._partial = self._identity(source_file, stat)
+        self._partial.update({ 'memory': memory, 'offset': offset })
+        self._save()
+
+    def complete(self, memory, source_file, stat, content_hash, status):
+        '''
+        Records that the memory has been completed from the source file.
+        '''
+        entry = self._identity(source_file, stat)
+        entry.update({ 'hash': content_hash, 'status': status })
+        self._memories[memory] = entry
+        self._partial = None
+        self._save()
+
+    def finish(self):
+        '''
+        Deletes the journal once the transfer has completed.
+        '''
+        self._memories = {}
+        self._partial  = None
+        if os.path.isfile(self._path):
+            os.remove(self._path)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def _save(self):
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({ 'version': JOURNAL_VERSION, 'memories': self._memories, 'partial': self._partial }, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+
+#EOF
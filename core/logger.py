@@ -7,11 +7,10 @@
 #
 # author:   Murray Altheim
 # created:  2020-01-14
-# modified: 2023-03-19 (simplified)
+# modified: 2026-10-17 (queued mode)
 #
 
-import os, logging, math, traceback, threading
-from logging.handlers import RotatingFileHandler
+import os, time, atexit, logging, threading
 from datetime import datetime as dt
 from enum import Enum
 from colorama import init, Fore, Style
@@ -64,16 +63,23 @@ class Logger(object):
     __color_critical = Fore.WHITE  + Style.NORMAL
     __color_reset    = Style.RESET_ALL
 
-    def __init__(self, name, log_to_console=True, log_to_file=False, level=Level.INFO):
+    def __init__(self, name, log_to_console=True, log_to_file=False, level=Level.INFO, queued=False):
         '''
         Writes to a named log with the provided level, defaulting to a
         console (stream) handler unless 'log_to_file' is True, in which
         case only write to file, not to the console.
 
+        Messages may be '%'-style format strings followed by their arguments,
+        which are only formatted if the message's level is enabled. If
+        'queued' is True, messages are put on a queue and formatted and
+        written by a background thread, so that logging never blocks the
+        caller on console I/O. The queue is flushed on close() and at exit.
+
         :param name:           the name identified with the log output
         :param log_to_console:  if True will log to console (default True)
         :param log_to_file:    if True will subsequentially log to file, for all loggers (default False)
         :param level:          the log level
+        :param queued:         if True will format and write messages on a background thread (default False)
         '''
         # configuration preliminaries ............
         _log_to_file = False
@@ -90,7 +96,6 @@ class Logger(object):
         self.__WARN_TOKEN  = 'WARN '
         self.__ERROR_TOKEN = 'ERROR'
         self.__FATAL_TOKEN = 'FATAL'
-        self._mf           = '{}{} : {}{}'
 
         # create logger ..........................
         self.__mutex = threading.Lock()
@@ -98,6 +103,8 @@ class Logger(object):
         self.__log.propagate = False
         self._name   = name
         self._sh     = None # stream handler
+        self.__queue    = None
+        self.__listener = None
         if not self.__log.handlers:
             if log_to_console: # log to console ................................
                 self._sh = logging.StreamHandler()
@@ -106,9 +113,30 @@ class Logger(object):
                             + Fore.RESET + ' %(name)s ' + ( ' '*(16-len(name)) ) + ' : %(message)s', datefmt=self._date_format))
                 else:
                     self._sh.setFormatter(logging.Formatter('%(name)s ' + ( ' '*(16-len(name)) ) + ' : %(message)s'))
-                self.__log.addHandler(self._sh)
+                if queued:
+                    self.__start_listener(self._sh)
+                else:
+                    self.__log.addHandler(self._sh)
         self.level = level
 
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def __start_listener(self, handler):
+        '''
+        Routes the log through a queue to a listener thread that writes to
+        the handler.
+        '''
+        import queue
+        import logging.handlers # only needed in queued mode
+        self.__queue = queue.Queue()
+        queue_handler = logging.handlers.QueueHandler(self.__queue)
+        # by default the record is formatted in the calling thread; instead
+        # pass it as is, to be formatted by the listener's thread
+        queue_handler.prepare = lambda record: record
+        self.__log.addHandler(queue_handler)
+        self.__listener = logging.handlers.QueueListener(self.__queue, handler, respect_handler_level=True)
+        self.__listener.start()
+        atexit.register(self.close)
+
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
     @property
     def name(self):
@@ -117,6 +145,24 @@ class Logger(object):
         '''
         return self._name
 
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def flush(self, timeout=None):
+        '''
+        Waits until all queued messages have been written, or for at most
+        'timeout' seconds if provided. With a timeout the queue is polled
+        rather than joined, taking none of its locks, so this is safe to
+        call from a signal handler that may have interrupted a put().
+        '''
+        if self.__listener:
+            if timeout is None:
+                self.__queue.join()
+            else:
+                deadline = time.monotonic() + timeout
+                while self.__queue.unfinished_tasks and time.monotonic() < deadline:
+                    time.sleep(0.01)
+        if self._sh:
+            self._sh.flush()
+
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
     def close(self):
         '''
@@ -126,6 +172,10 @@ class Logger(object):
         system should be made after this call.
         '''
 #       self.suppress()
+        if self.__listener:
+            # writes any queued messages before the listener thread exits
+            self.__listener.stop()
+            self.__listener = None
         logging.shutdown()
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
@@ -183,74 +233,86 @@ class Logger(object):
         return type(self).__suppress
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def debug(self, message):
+    def __emit(self, level, color, token, message, args):
+        '''
+        Logs the message if its level is enabled, leaving any arguments to
+        be formatted into it by the logging system.
+        '''
+        if not self.__log.isEnabledFor(level.value):
+            return
+        message = color + token + ' : ' + str(message) + Logger.__color_reset
+        if self.__listener:
+            self.__log.log(level.value, message, *args)
+        else:
+            with self.__mutex:
+                self.__log.log(level.value, message, *args)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def debug(self, message, *args):
         '''
         Prints a debug message.
 
         The optional 'end' argument is for special circumstances where a different end-of-line is desired.
         '''
         if not self.suppressed:
-            with self.__mutex:
-                self.__log.debug(self._mf.format(Logger.__color_debug, self.__DEBUG_TOKEN, message, Logger.__color_reset))
+            self.__emit(Level.DEBUG, Logger.__color_debug, self.__DEBUG_TOKEN, message, args)
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def info(self, message):
+    def info(self, message, *args):
         '''
         Prints an informational message.
 
         The optional 'end' argument is for special circumstances where a different end-of-line is desired.
         '''
         if not self.suppressed:
-            with self.__mutex:
-                self.__log.info(self._mf.format(Logger.__color_info, self.__INFO_TOKEN, message, Logger.__color_reset))
+            self.__emit(Level.INFO, Logger.__color_info, self.__INFO_TOKEN, message, args)
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def notice(self, message):
+    def notice(self, message, *args):
         '''
         Functionally identical to info() except it prints the message brighter.
 
         The optional 'end' argument is for special circumstances where a different end-of-line is desired.
         '''
         if not self.suppressed:
-            with self.__mutex:
-                self.__log.info(self._mf.format(Logger.__color_notice, self.__INFO_TOKEN, message, Logger.__color_reset))
+            self.__emit(Level.INFO, Logger.__color_notice, self.__INFO_TOKEN, message, args)
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def warning(self, message):
+    def warning(self, message, *args):
         '''
         Prints a warning message.
 
         The optional 'end' argument is for special circumstances where a different end-of-line is desired.
         '''
         if not self.suppressed:
-            with self.__mutex:
-                self.__log.warning(self._mf.format(Logger.__color_warning, self.__WARN_TOKEN, message, Logger.__color_reset))
+            self.__emit(Level.WARN, Logger.__color_warning, self.__WARN_TOKEN, message, args)
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def error(self, message):
+    def error(self, message, *args):
         '''
         Prints an error message.
 
         The optional 'end' argument is for special circumstances where a different end-of-line is desired.
         '''
         if not self.suppressed:
-            with self.__mutex:
-                self.__log.error(self._mf.format(Logger.__color_error, self.__ERROR_TOKEN, Style.NORMAL + message, Logger.__color_reset))
+            self.__emit(Level.ERROR, Logger.__color_error, self.__ERROR_TOKEN, Style.NORMAL + message, args)
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def critical(self, message):
+    def critical(self, message, *args):
         '''
         Prints a critical or otherwise application-fatal message.
         '''
-        with self.__mutex:
-            self.__log.critical(self._mf.format(Logger.__color_critical, self.__FATAL_TOKEN, Style.BRIGHT + message, Logger.__color_reset))
+        self.__emit(Level.CRITICAL, Logger.__color_critical, self.__FATAL_TOKEN, Style.BRIGHT + message, args)
 
     # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-    def file(self, message):
+    def file(self, message, *args):
         '''
         This is just info() but without any formatting.
         '''
-        with self.__mutex:
-            self.__log.info(message)
+        if self.__listener:
+            self.__log.info(message, *args)
+        else:
+            with self.__mutex:
+                self.__log.info(message, *args)
 
 #EOF
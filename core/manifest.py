@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, json
+
+from core.copier import hash_file
+
+MANIFEST_FILENAME = '.rc5tx-manifest.json'
+MANIFEST_VERSION  = 1
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class Manifest(object):
+    '''
+    A record of the file written to each memory of the target, stored as
+    a JSON file in the target (WAVE) directory. Each entry is keyed by the
+    two-digit memory number and records the source filename, its size,
+    modification time and content hash, the gain (if any) with which it was
+    converted, and the target file name and size.
+
+    :param target:  the target (WAVE) directory
+    '''
+    def __init__(self, target):
+        self._path    = os.path.join(target, MANIFEST_FILENAME)
+        self._entries = {}
+        if os.path.isfile(self._path):
+            try:
+                with open(self._path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self._entries = data.get('memories', {})
+            except ValueError:
+                pass # a corrupt manifest (e.g., the RC-5 unplugged mid-write) is treated as none
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def path(self):
+        return self._path
+
+    def memories(self):
+        '''
+        Return the sorted list of memories recorded in the manifest.
+        '''
+        return sorted(self._entries.keys())
+
+    def get(self, memory):
+        return self._entries.get(memory)
+
+    def remove(self, memory):
+        self._entries.pop(memory, None)
+
+    def move(self, memory, new_memory):
+        '''
+        Records that the file of the memory has been moved to the new memory,
+        replacing any entry there.
+        '''
+        self._entries[new_memory] = self._entries.pop(memory)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def put(self, memory, source_file, target_file, content_hash, stat=None, gain=None):
+        '''
+        Records the source file written to the memory as the target file,
+        which may differ in size from the source if it was converted, with
+        the gain applied if normalised. The source file's stat result may be
+        provided to avoid a re-stat.
+        '''
+        if stat is None:
+            stat = os.stat(source_file)
+        self._entries[memory] = {
+            'source': os.path.basename(source_file),
+            'size':   stat.st_size,
+            'mtime':  stat.st_mtime_ns,
+            'hash':   content_hash,
+            'gain':   gain,
+            'file':   os.path.basename(target_file),
+            'target_size': os.stat(target_file).st_size
+        }
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def is_current(self, memory, source_file, target_file, stat=None, gain=None):
+        '''
+        Returns True if the memory already holds the source file, i.e., the
+        recorded name, size, content and gain match and the target file is
+        intact.
+        The content hash is only computed when the modification time differs,
+        in which case the entry's time is updated if the content is unchanged.
+        '''
+        entry = self._entries.get(memory)
+        if entry is None or entry['source'] != os.path.basename(source_file) \
+                or entry['file'] != os.path.basename(target_file) or entry.get('gain') != gain:
+            return False
+        if stat is None:
+            stat = os.stat(source_file)
+        if entry['size'] != stat.st_size:
+            return False
+        try:
+            if os.stat(target_file).st_size != entry.get('target_size'):
+                return False
+        except FileNotFoundError:
+            return False
+        if entry['mtime'] != stat.st_mtime_ns:
+            if hash_file(source_file) != entry['hash']:
+                return False
+            entry['mtime'] = stat.st_mtime_ns
+        return True
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def save(self):
+        '''
+        Writes the manifest to a temporary file then renames it into place,
+        so an interrupted write never leaves a corrupt manifest.
+        '''
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({ 'version': MANIFEST_VERSION, 'memories': self._entries }, f, indent=4)
+        os.replace(tmp_path, self._path)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def delete(self):
+        '''
+        Deletes the manifest file, e.g., after a full (non-sync) transfer
+        has made it stale.
+        '''
+        self._entries = {}
+        if os.path.isfile(self._path):
+            os.remove(self._path)
+
+#EOF
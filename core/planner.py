@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, json, shutil
+
+from core.wavinfo import RC5_CHANNELS, RC5_SAMPLE_RATE
+from core.walker import walk_wav_files
+
+# from the RC-5 User's Manual: "The maximum recording time is approximately
+# 1.5 hours for one track, and approximately 13 hours total for all memories."
+MAX_TRACK_SECONDS = 90 * 60
+MAX_TOTAL_SECONDS = 13 * 60 * 60
+# the size of the header written to converted files
+CONVERTED_HEADER_SIZE = 58
+# the number of throughput measurements kept for each target
+THROUGHPUT_SAMPLES = 5
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def target_size(info):
+    '''
+    Returns the size in bytes of the file as it will be written to the
+    target: as is if in the RC-5's native format, otherwise once converted.
+    '''
+    if info.is_rc5_native:
+        return info.file_size
+    frames = ( info.frames * RC5_SAMPLE_RATE + info.sample_rate - 1 ) // info.sample_rate
+    return CONVERTED_HEADER_SIZE + frames * RC5_CHANNELS * 4
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class ThroughputHistory(object):
+    '''
+    The write throughput measured on recent transfers to each target,
+    stored as a JSON file so that later runs can estimate transfer times.
+
+    :param path:  the path to the JSON history file
+    '''
+    def __init__(self, path):
+        self._path    = path
+        self._targets = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as f:
+                    self._targets = json.load(f)
+            except ValueError:
+                pass # a corrupt history is simply discarded
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def estimate(self, target):
+        '''
+        Returns the median of the recent throughputs to the target in bytes
+        per second, or None if none have been measured.
+        '''
+        samples = sorted(self._targets.get(os.path.abspath(target), []))
+        if not samples:
+            return None
+        mid = len(samples) // 2
+        return samples[mid] if len(samples) % 2 else ( samples[mid - 1] + samples[mid] ) / 2
+
+    def record(self, target, nbytes, seconds):
+        '''
+        Records a transfer of 'nbytes' bytes to the target in 'seconds'
+        seconds, and saves the history. Tiny transfers, whose time is mostly
+        overhead, are ignored.
+        '''
+        if nbytes < 1024 * 1024 or seconds <= 0:
+            return
+        samples = self._targets.setdefault(os.path.abspath(target), [])
+        samples.append(nbytes / seconds)
+        del samples[:-THROUGHPUT_SAMPLES]
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._targets, f, indent=4)
+        os.replace(tmp_path, self._path)
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class TransferPlan(object):
+    '''
+    The sizes and durations of the files to be transferred, checked against
+    the RC-5's per-track and total recording limits and the free space on
+    the target, with an estimate of the transfer time.
+
+    Existing WAV files on the target are counted as reclaimable space, since
+    they are either deleted or replaced by the transfer.
+
+    :param infos:    the WavInfo of each file to be transferred
+    :param target:   the target (WAVE) directory
+    :param history:  an optional ThroughputHistory used to estimate the time
+    '''
+    def __init__(self, infos, target, history=None):
+        self._sizes          = { info.path: target_size(info) for info in infos }
+        self._total_bytes    = sum(self._sizes.values())
+        self._total_duration = sum(info.duration for info in infos)
+        self._long_files     = [ info for info in infos if info.duration > MAX_TRACK_SECONDS ]
+        self._reclaimable    = sum(os.path.getsize(f) for f in walk_wav_files(target, prune=lambda name: name.startswith('.')))
+        self._free           = shutil.disk_usage(target).free
+        self._throughput     = history.estimate(target) if history else None
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def size(self, path):
+        '''
+        Return the size the file at 'path' will have on the target.
+        '''
+        return self._sizes[os.fspath(path)]
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    @property
+    def total_duration(self):
+        return self._total_duration
+
+    @property
+    def long_files(self):
+        '''
+        Return the WavInfo of any file longer than the per-track limit.
+        '''
+        return self._long_files
+
+    @property
+    def available_bytes(self):
+        '''
+        Return the free space on the target plus the space reclaimable from
+        existing WAV files.
+        '''
+        return self._free + self._reclaimable
+
+    @property
+    def throughput(self):
+        '''
+        Return the estimated throughput in bytes per second, or None.
+        '''
+        return self._throughput
+
+    @property
+    def estimated_seconds(self):
+        '''
+        Return the estimated transfer time in seconds, or None if there is
+        no throughput measured on earlier runs.
+        '''
+        if not self._throughput:
+            return None
+        return self._total_bytes / self._throughput
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def problems(self):
+        '''
+        Returns a list of descriptions of any limits the plan exceeds, empty
+        if the transfer can proceed.
+        '''
+        problems = []
+        for info in self._long_files:
+            problems.append('longer than the {:.1f} hour track limit ({:.1f} hours): {}'.format(
+                    MAX_TRACK_SECONDS / 3600, info.duration / 3600, info.path))
+        if self._total_duration > MAX_TOTAL_SECONDS:
+            problems.append('total duration of {:.1f} hours exceeds the {:.0f} hour limit.'.format(
+                    self._total_duration / 3600, MAX_TOTAL_SECONDS / 3600))
+        if self._total_bytes > self.available_bytes:
+            problems.append('transfer requires {:.1f}MB but only {:.1f}MB is available on the target.'.format(
+                    self._total_bytes / 1e6, self.available_bytes / 1e6))
+        return problems
+
+#EOF
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, json, math, time, threading
+from contextlib import contextmanager
+
+# the phases whose files are written to the target
+WRITE_PHASES  = ( 'copy', 'convert' )
+# the number of slowest files reported
+SLOWEST_FILES = 5
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def percentile(values, p):
+    '''
+    Returns the p-th percentile of the values (by nearest rank), or None if
+    there are no values.
+    '''
+    values = sorted(values)
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100.0 * len(values)) - 1)]
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class Trace(object):
+    '''
+    Records the wall time of each phase of a transfer and the time and bytes
+    of each operation on a file (probe, delete, mkdir, copy, convert, verify)
+    so that the transfer can report where its time went. Files may be
+    recorded from any thread.
+    '''
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._started = time.time()
+        self._phases  = {}
+        self._events  = []
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @contextmanager
+    def phase(self, name):
+        '''
+        Times the wall time of a phase of the transfer. A phase timed more
+        than once accumulates its time.
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0.0) + time.perf_counter() - start
+
+    @contextmanager
+    def file(self, phase, path):
+        '''
+        Times an operation on a single file, yielding a dictionary in which
+        the caller may set the number of 'bytes' read or written.
+        '''
+        event = { 'phase': phase, 'file': os.fspath(path), 'bytes': 0 }
+        start = time.perf_counter()
+        try:
+            yield event
+        finally:
+            event['seconds'] = time.perf_counter() - start
+            self._record(event)
+
+    def add(self, phase, path, seconds, nbytes=0):
+        '''
+        Records an operation on a single file that was timed elsewhere, e.g.,
+        on another thread, returning its event.
+        '''
+        event = { 'phase': phase, 'file': os.fspath(path), 'bytes': nbytes, 'seconds': seconds }
+        self._record(event)
+        return event
+
+    def _record(self, event):
+        with self._lock:
+            self._events.append(event)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @staticmethod
+    def _throughput(nbytes, seconds):
+        return nbytes / seconds if seconds > 0 and nbytes > 0 else None
+
+    def summary(self):
+        '''
+        Returns the trace as a dictionary: the wall time of each phase along
+        with the time, bytes and count of its file operations, the overall
+        write throughput in bytes per second, the 50th and 95th percentile
+        latencies of the files written, the slowest of those files, and
+        every file operation with its throughput.
+        '''
+        with self._lock:
+            events = [ dict(event) for event in self._events ]
+            wall_times = dict(self._phases)
+        phases = {}
+        for name in list(wall_times) + [ e['phase'] for e in events if e['phase'] not in wall_times ]:
+            phase_events = [ e for e in events if e['phase'] == name ]
+            phases[name] = {
+                'seconds':      wall_times.get(name),
+                'file_seconds': sum(e['seconds'] for e in phase_events),
+                'bytes':        sum(e['bytes'] for e in phase_events),
+                'files':        len(phase_events)
+            }
+        for event in events:
+            event['throughput'] = self._throughput(event['bytes'], event['seconds'])
+        writes = [ e for e in events if e['phase'] in WRITE_PHASES ]
+        write_bytes = sum(e['bytes'] for e in writes)
+        # the transfer's wall time if timed, otherwise the time spent writing
+        write_seconds = wall_times.get('transfer') or sum(e['seconds'] for e in writes)
+        return {
+            'started':    time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self._started)),
+            'elapsed':    time.time() - self._started,
+            'phases':     phases,
+            'throughput': self._throughput(write_bytes, write_seconds),
+            'latency':    {
+                'p50': percentile([ e['seconds'] for e in writes ], 50),
+                'p95': percentile([ e['seconds'] for e in writes ], 95)
+            },
+            'slowest':    sorted(writes, key=lambda e: e['seconds'], reverse=True)[:SLOWEST_FILES],
+            'files':      events
+        }
+
+    def save(self, path):
+        '''
+        Writes the summary of the trace as a JSON file, returning the summary.
+        '''
+        summary = self.summary()
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=4)
+        return summary
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class NullTrace(Trace):
+    '''
+    A Trace that records nothing, used by the operations that take a Trace
+    when they're given none. File operations are still timed, since their
+    callers log the throughput of the event.
+    '''
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def _record(self, event):
+        pass
+
+# shared by every operation not given a Trace, as it holds no state
+NULL_TRACE = NullTrace()
+
+#EOF
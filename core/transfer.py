@@ -0,0 +1,1023 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# The blocking operations of a transfer: scanning the source, cleaning the
+# target and copying, converting or syncing memories, or pulling them back
+# from the target into an archive. Each takes the logger
+# to write its progress to, and optionally a Trace to record its timing in.
+#
+
+import os, re, math, json, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from colorama import Fore
+
+from core.wavinfo import WavInfo, WavFormatError
+from core.manifest import Manifest
+from core.copier import COPY_BLOCK_SIZE, TMP_SUFFIX, copy_file, fan_out_file, hash_file, verify_file
+from core.walker import DirectoryIndex, walk_wav_files
+from core.cache import ContentCache
+from core.trace import NULL_TRACE
+from core.dedupe import find_duplicates
+from core.assigner import assign_memories, parse_pins, read_playlist, plan_renames
+from core.archive import SAMPLE_BLOCKS, SAMPLE_BYTES, SNAPSHOT_FILENAME, sample_hash
+
+# the number of threads used to probe source files while copying
+PROBE_WORKERS = 4
+# the RC-5 has a limit of 99 memories
+MAX_MEMORIES = 99
+# verification status of a transferred file
+VERIFIED  = 'ok'
+MISMATCH  = 'MISMATCH'
+UNCHANGED = 'unchanged'
+# the status of a memory pulled from the target that wasn't pulled before, or has changed since
+NEW       = 'new'
+CHANGED   = 'changed'
+# the temporary directory in the target through which a cycle of memories is moved
+REORDER_DIRECTORY = '.rc5tx-reorder'
+# the cache of waveform envelopes, by content hash, and its maximum size
+ENVELOPE_CACHE_BYTES = 4 * 1024 * 1024
+# a memory directory of the target, e.g., '037_1'
+MEMORY_DIRECTORY_PATTERN = re.compile(r'^(\d{3})_\d$')
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+# hidden directories (e.g., '.Trashes') are not scanned
+def is_hidden(name):
+    return name.startswith('.')
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def get_filename(path):
+    return path.name
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def clean_target_directory(_log, target, confirm=None, trace=NULL_TRACE, dry_run=False):
+    '''
+    Deletes the WAV files in the target directory, once the 'confirm'
+    function (if provided) returns True when called with their number.
+    Any partial files left by an interrupted copy are deleted regardless.
+    If 'dry_run' is True the files are only listed, not deleted. Returns
+    False if a file could not be deleted.
+    '''
+    try:
+        delete_partial_files(_log, target, trace, dry_run)
+    except OSError as e:
+        _log.error('Error: %s - %s.', e.filename, e.strerror)
+        return False
+    target_files = list(walk_wav_files(target, prune=is_hidden))
+    if len(target_files) == 0:
+        _log.info('target directory contained no WAV files.')
+        return True
+    if confirm is None or confirm(len(target_files)):
+        for f in target_files:
+            if dry_run:
+                _log.info('deleting target file (dry run):\t'+Fore.WHITE+'%s', f)
+            else:
+                try:
+                    _log.info('deleting target file:\t'+Fore.WHITE+'%s', f)
+                    with trace.file('delete', f) as event:
+                        event['bytes'] = os.path.getsize(f)
+                        os.remove(f)
+                except OSError as e:
+                    _log.error('Error: %s - %s.', e.filename, e.strerror)
+                    return False
+        _log.info('target directory successfully cleaned.')
+        return True
+    else:
+        _log.info('user did not want to clean target directory, will overwrite any existing matching files.')
+        return True
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def validate_files(_log, source_files, probe_workers=PROBE_WORKERS, limit=None, trace=NULL_TRACE):
+    '''
+    Checks the header of each source file on a pool of 'probe_workers'
+    threads, before anything is written to the target. Returns a tuple of
+    three lists: the accepted files (in the RC-5's native format) and the
+    convertible files, both as (file, WavInfo) pairs, and the rejected files
+    as (file, reason) pairs.
+
+    The source files may be a stream (e.g., from walk_wav_files()), which is
+    consumed as files are found. If 'limit' is provided the stream is no
+    longer consumed once more than that number of files has been accepted
+    or found convertible.
+    '''
+    accepted    = []
+    convertible = []
+    rejected    = []
+    count_lock  = threading.Lock()
+    counts      = [ 0 ]
+    def check(source_file):
+        try:
+            with trace.file('probe', source_file):
+                info = WavInfo(os.fspath(source_file))
+        except (OSError, WavFormatError) as e:
+            return source_file, None, str(e)
+        if not info.is_rc5_native and not info.is_convertible:
+            return source_file, None, 'unsupported format ({}): {}'.format(info, source_file)
+        with count_lock:
+            counts[0] += 1
+        return source_file, info, None
+    with ThreadPoolExecutor(max_workers=max(1, probe_workers), thread_name_prefix='validate') as executor:
+        futures = []
+        for source_file in source_files:
+            futures.append(executor.submit(check, source_file))
+            if limit is not None and counts[0] > limit:
+                break
+        for future in futures:
+            source_file, info, reason = future.result()
+            if reason:
+                rejected.append(( source_file, reason ))
+            elif info.is_rc5_native:
+                accepted.append(( source_file, info ))
+            else:
+                convertible.append(( source_file, info ))
+    return accepted, convertible, rejected
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+
+# function to convert the information into some readable format
+def output_duration(length):
+    hours = length // 3600  # hours
+    length %= 3600
+    mins = length // 60     # minutes
+    length %= 60
+    seconds = length        # seconds
+    return hours, mins, seconds
+
+def get_wav_duration(_log, file):
+    _log.info('getting duration of file: %s…', file)
+    try:
+        # only the RIFF headers are read, not the sample data
+        info = WavInfo(os.fspath(file))
+        return format_duration(info.duration)
+    except Exception as e:
+        _log.error('error getting wave length: %s', e)
+        return 'EE:EE:EE'
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def get_memory_directory(target, memory):
+    # ./WAVE/001_1, ./WAVE/002_1, ... ./WAVE/099_1
+    return os.path.join(target, '0{:02d}_1'.format(memory))
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def make_memory_directory(memory_dir, trace):
+    if not os.path.isdir(memory_dir):
+        with trace.file('mkdir', memory_dir):
+            os.makedirs(memory_dir)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def delete_memory_files(_log, memory_dir, keep=None, trace=NULL_TRACE, dry_run=False):
+    '''
+    Deletes any WAV files in the memory directory other than 'keep',
+    returning the number of files deleted (or if 'dry_run' is True, that
+    would have been).
+    '''
+    count = 0
+    if not os.path.isdir(memory_dir):
+        return count
+    for name in os.listdir(memory_dir):
+        if name == keep or os.path.splitext(name)[-1].lower() != '.wav':
+            continue
+        f = os.path.join(memory_dir, name)
+        if dry_run:
+            _log.info('deleting target file (dry run):\t'+Fore.WHITE+'%s', f)
+        else:
+            _log.info('deleting target file:\t'+Fore.WHITE+'%s', f)
+            with trace.file('delete', f) as event:
+                event['bytes'] = os.path.getsize(f)
+                os.remove(f)
+        count += 1
+    return count
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def delete_partial_files(_log, target, trace=NULL_TRACE, dry_run=False):
+    '''
+    Deletes the partially written (.wav.tmp) files left in the memory
+    directories of the target by an interrupted copy, which only a resumed
+    transfer would complete, returning the number of files deleted (or if
+    'dry_run' is True, that would have been).
+    '''
+    count = 0
+    for directory, dirs, files in os.walk(target):
+        dirs[:] = [ d for d in dirs if not is_hidden(d) ]
+        for name in files:
+            if not name.lower().endswith('.wav' + TMP_SUFFIX):
+                continue
+            f = os.path.join(directory, name)
+            if dry_run:
+                _log.info('deleting partial file (dry run):\t'+Fore.WHITE+'%s', f)
+            else:
+                _log.info('deleting partial file:\t'+Fore.WHITE+'%s', f)
+                with trace.file('delete', f) as event:
+                    event['bytes'] = os.path.getsize(f)
+                    os.remove(f)
+            count += 1
+    return count
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def format_duration(seconds):
+    hours, mins, seconds = output_duration(int(seconds))
+    return '{:02d}:{:02d}:{:02d}'.format(hours, mins, seconds)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def format_throughput(event):
+    '''
+    Formats the throughput of a file operation recorded by a Trace.
+    '''
+    if event['seconds'] <= 0:
+        return '{:.1f}MB'.format(event['bytes'] / 1e6)
+    return '{:.1f}MB in {:.2f}s, {:.1f}MB/s'.format(event['bytes'] / 1e6, event['seconds'], event['bytes'] / 1e6 / event['seconds'])
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def transfer_file(_log, source_file, target_file, offset=0, checkpoint=None, trace=NULL_TRACE, copy_options=None):
+    '''
+    Copies a single source file to the target file, creating the memory
+    directory if necessary. Returns the content hash of the file, computed
+    as it is copied. The 'offset' and 'checkpoint' arguments are as for
+    copy_file(), to resume an interrupted copy, as are the 'method',
+    'block_size' and 'fsync' of the optional 'copy_options' dictionary.
+    '''
+    _log.info('transferring:\t'+Fore.WHITE+'%s', source_file)
+    target_dir = os.path.dirname(target_file)
+    make_memory_directory(target_dir, trace)
+    # do the deed
+    if offset > 0:
+        _log.info('resuming copy at %.1fMB…', offset / 1e6)
+    with trace.file('copy', source_file) as event:
+        content_hash = copy_file(source_file, target_file, offset=offset, checkpoint=checkpoint, **( copy_options or {} ))
+        event['bytes'] = os.path.getsize(target_file) - offset
+    _log.info('…to directory:\t'+Fore.MAGENTA+'%s'+Fore.CYAN+' (%s)', target_dir, format_throughput(event))
+    return content_hash
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def convert_file(_log, source_file, info, target_files, gain=None, trace=NULL_TRACE, copy_options=None, workers=None):
+    '''
+    Converts a single source file to the RC-5's native format as each of the
+    target files, creating the memory directories if necessary, applying the
+    linear 'gain' if provided. Conversions are cached by the content hash of
+    the source and the gain, so a file that has been converted before is
+    copied from the cache instead, with the optional 'copy_options'. No
+    more than 'workers' targets (if provided) are converted at once; any
+    more are copied from the cache once it holds the conversion.
+
+    Returns the content hashes of the source and the converted file, and a
+    dictionary of each target file to a dictionary of its 'error' (the
+    OSError that prevented it being written, or None), so that an error
+    writing one target doesn't stop the others, and the 'seconds' and
+    'bytes' of its write, each recorded as an event of the Trace.
+    '''
+    copy_options = copy_options or {}
+    # numpy is only imported once a conversion is needed, not at startup
+    from core.convert import convert_wav, CONVERSION_VERSION
+    if gain:
+        _log.info('converting (%s, %+.1fdB):\t'+Fore.WHITE+'%s', info, 20.0 * math.log10(gain), source_file)
+    else:
+        _log.info('converting (%s):\t'+Fore.WHITE+'%s', info, source_file)
+    results = {}
+    pending = []
+    for target_file in target_files:
+        try:
+            make_memory_directory(os.path.dirname(target_file), trace)
+            pending.append(target_file)
+        except OSError as e:
+            results[target_file] = { 'error': e }
+    target_hash = None
+    with trace.file('hash', source_file) as event:
+        source_hash = hash_file(source_file)
+        event['bytes'] = info.file_size
+    cache = ContentCache('converted', '.wav')
+    key = '{}-v{}'.format(source_hash, CONVERSION_VERSION) + ( '-g{:.6f}'.format(gain) if gain else '' )
+    phases = {} # whether each target was converted or copied from the cache
+    while pending:
+        cached_file = cache.get(key)
+        if cached_file:
+            _log.info('using cached conversion:\t'+Fore.WHITE+'%s', cached_file)
+            if len(pending) == 1:
+                result = results[pending[0]] = { 'error': None, 'seconds': 0.0, 'bytes': 0 }
+                start = time.perf_counter()
+                try:
+                    target_hash = copy_file(cached_file, pending[0], **copy_options)
+                    result['bytes'] = os.path.getsize(pending[0])
+                except OSError as e:
+                    result['error'] = e
+                result['seconds'] = time.perf_counter() - start
+            else:
+                target_hash, copied = fan_out_file(cached_file, pending, block_size=copy_options.get('block_size', COPY_BLOCK_SIZE),
+                        fsync=copy_options.get('fsync', False), workers=workers)
+                results.update(copied)
+            phases.update({ target_file: 'copy' for target_file in pending })
+            break
+        # the converted output is written to each target (and the cache) as it's produced
+        group, pending = ( pending[:workers], pending[workers:] ) if workers else ( pending, [] )
+        target_hash, converted = convert_wav(info, group + [ cache.path(key) ], gain=gain,
+                fsync=copy_options.get('fsync', False))
+        results.update({ target_file: converted[target_file] for target_file in group })
+        phases.update({ target_file: 'convert' for target_file in group })
+    # an event for each target written, as for a copy
+    for target_file in target_files:
+        result = results[target_file]
+        if not result['error']:
+            event = trace.add(phases[target_file], target_file, result['seconds'], result['bytes'])
+            _log.info('…to directory:\t'+Fore.MAGENTA+'%s'+Fore.CYAN+' (%s)', os.path.dirname(target_file), format_throughput(event))
+    return source_hash, target_hash, results
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def write_memory(_log, source_file, target_file, conversions, verify, offset=0, checkpoint=None, gains=None, trace=NULL_TRACE,
+        copy_options=None):
+    '''
+    Copies or converts the source file to the target file and, if 'verify'
+    is True, reads the target back to confirm its content hash. Returns the
+    content hash of the source and the status, one of VERIFIED, MISMATCH or
+    None if not verified. A copy (but not a conversion) may be resumed from
+    a checkpointed offset. A conversion applies the gain of the source file
+    if found in the 'gains' dictionary. The optional 'copy_options' are
+    passed to copy_file().
+    '''
+    if source_file in conversions:
+        source_hash, target_hash, results = convert_file(_log, source_file, conversions[source_file], [ target_file ],
+                ( gains or {} ).get(source_file), trace, copy_options)
+        if results[target_file]['error']:
+            raise results[target_file]['error']
+    else:
+        source_hash = target_hash = transfer_file(_log, source_file, target_file, offset, checkpoint, trace, copy_options)
+    if not verify:
+        return source_hash, None
+    with trace.file('verify', target_file) as event:
+        event['bytes'] = os.path.getsize(target_file)
+        verified = verify_file(target_file, target_hash)
+    if verified:
+        return source_hash, VERIFIED
+    _log.error('verification failed, target does not match source:\t'+Fore.WHITE+'%s', target_file)
+    return source_hash, MISMATCH
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def fan_out_memory(_log, source_file, target_files, conversions, verify, gains=None, trace=NULL_TRACE, copy_options=None,
+        workers=None):
+    '''
+    Copies or converts the source file to each of the target files, reading
+    the source only once (for each group of up to 'workers' targets written
+    at once), and if 'verify' is True reads each target back to confirm its
+    content hash. Returns the content hash of the source and a
+    dictionary of each target file to its status as for write_memory(), or
+    to the OSError that prevented it being written, so that an error writing
+    one target doesn't stop the others. The 'block_size' and 'fsync' of the
+    optional 'copy_options' are passed to fan_out_file().
+    '''
+    copy_options = copy_options or {}
+    if source_file in conversions:
+        source_hash, target_hash, results = convert_file(_log, source_file, conversions[source_file], target_files,
+                ( gains or {} ).get(source_file), trace, copy_options, workers)
+        written = [ target_file for target_file in target_files if not results[target_file]['error'] ]
+        verified = {}
+        if verify and written:
+            with ThreadPoolExecutor(max_workers=min(len(written), workers or len(written)), thread_name_prefix='verify') as executor:
+                verified = dict(zip(written, executor.map(lambda target_file: verify_file(target_file, target_hash), written)))
+        for target_file, result in results.items():
+            result['verified'] = verified.get(target_file)
+    else:
+        _log.info('transferring:\t'+Fore.WHITE+'%s', source_file)
+        results = {}
+        for target_file in target_files:
+            try:
+                make_memory_directory(os.path.dirname(target_file), trace)
+            except OSError as e:
+                results[target_file] = { 'error': e }
+        source_hash, copied = fan_out_file(source_file, [ target_file for target_file in target_files if target_file not in results ],
+                block_size=copy_options.get('block_size', COPY_BLOCK_SIZE), verify=verify, fsync=copy_options.get('fsync', False),
+                workers=workers)
+        results.update(copied)
+        for target_file, result in copied.items():
+            if not result['error']:
+                event = trace.add('copy', target_file, result['seconds'], result['bytes'])
+                _log.info('…to directory:\t'+Fore.MAGENTA+'%s'+Fore.CYAN+' (%s)', os.path.dirname(target_file), format_throughput(event))
+    statuses = {}
+    for target_file, result in results.items():
+        if result['error']:
+            statuses[target_file] = result['error']
+        elif result['verified'] is None:
+            statuses[target_file] = None
+        elif result['verified']:
+            statuses[target_file] = VERIFIED
+        else:
+            _log.error('verification failed, target does not match source:\t'+Fore.WHITE+'%s', target_file)
+            statuses[target_file] = MISMATCH
+    return source_hash, statuses
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def log_dry_run(_log, source_file, target_file):
+    '''
+    Lists a file that a dry run would have copied or converted to the target.
+    '''
+    _log.info('writing (dry run):\t'+Fore.WHITE+'%s'+Fore.MAGENTA+' → %s', source_file, target_file)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def transfer_files(_log, source, source_files, target, probe_workers=PROBE_WORKERS, conversions=None, verify=False, journal=None,
+        gains=None, trace=NULL_TRACE, copy_options=None, dry_run=False):
+    '''
+    Copies the source files to the numbered memory directories of the target,
+    converting those found in the 'conversions' dictionary (of source file to
+    WavInfo) to the RC-5's native format, with the linear gain of those also
+    found in the 'gains' dictionary. The source files are probed on a
+    pool of 'probe_workers' threads that runs alongside the copy loop, so the
+    copy only ever waits on the target device.
+
+    If a Journal is provided the progress of the transfer is recorded in it,
+    and memories it records as completed are not copied again, nor is the
+    checkpointed part of a partially copied file. If a Trace is provided the
+    time and bytes of each file operation are recorded in it. The optional
+    'copy_options' dictionary of the 'method', 'block_size' and 'fsync' of
+    each copy is passed to copy_file(). If 'dry_run' is True the files are
+    only listed, and nothing is written to the target or the journal.
+
+    Returns a catalog of memory to a tuple of (duration, target file, content
+    hash, status), which for a dry run is empty.
+    '''
+    catalog = {}
+    conversions = conversions or {}
+    file_count = len(source_files)
+    _log.info('transferring %d files from source directory:\t'+Fore.WHITE+'%s', count_files(source_files), source)
+    _log.info('                        to target directory:\t'+Fore.MAGENTA+'%s', target)
+    with ThreadPoolExecutor(max_workers=max(1, probe_workers), thread_name_prefix='probe') as executor:
+        # submitted in memory order, so the pool probes ahead of the copy loop
+        durations = [ executor.submit(get_wav_duration, _log, source_file) if source_file else None
+                for source_file in source_files ]
+        for i in range(file_count):
+            source_file = source_files[i]
+            if source_file is None: # an empty memory
+                continue
+            memory = '{:02d}'.format(i+1)
+            try:
+                target_file = os.path.join(get_memory_directory(target, i+1), os.path.basename(source_file))
+                if dry_run:
+                    log_dry_run(_log, source_file, target_file)
+                    continue
+                stat = os.stat(source_file)
+                entry = journal.completed(memory, source_file, stat) if journal else None
+                if entry and os.path.isfile(target_file):
+                    _log.info('already transferred:\t'+Fore.WHITE+'%s', source_file)
+                    content_hash, status = entry['hash'], entry['status']
+                elif journal:
+                    offset = journal.resume_offset(memory, source_file, stat)
+                    content_hash, status = write_memory(_log, source_file, target_file, conversions, verify, offset,
+                            lambda written: journal.checkpoint(memory, source_file, stat, written), gains, trace, copy_options)
+                    journal.complete(memory, source_file, stat, content_hash, status)
+                else:
+                    content_hash, status = write_memory(_log, source_file, target_file, conversions, verify, gains=gains, trace=trace,
+                            copy_options=copy_options)
+                catalog[memory] = ( durations[i].result(), target_file, content_hash, status )
+            except OSError as e:
+                _log.error('Error: %s - %s.', e.filename, e.strerror)
+            except ValueError as e:
+                _log.error('Error converting %s: %s', source_file, e)
+    return catalog
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def fan_out_files(_log, source, source_files, targets, probe_workers=PROBE_WORKERS, conversions=None, verify=False, journals=None,
+        gains=None, trace=NULL_TRACE, copy_options=None, dry_run=False):
+    '''
+    Copies the source files to the numbered memory directories of each of
+    the targets as transfer_files() does, but reading each source file only
+    once, with each target written on its own thread so that a slow target
+    holds back the others as little as possible; no more than 'probe_workers'
+    targets are written at once. An error writing to one
+    target doesn't stop the others. The progress of each target is recorded
+    in its Journal, if found in the 'journals' dictionary. If 'dry_run' is
+    True the files are only listed, as for transfer_files().
+
+    Returns a dictionary of each target to its catalog, as for transfer_files().
+    '''
+    catalogs = { target: {} for target in targets }
+    conversions = conversions or {}
+    journals = journals or {}
+    file_count = len(source_files)
+    _log.info('transferring %d files from source directory:\t'+Fore.WHITE+'%s', count_files(source_files), source)
+    for target in targets:
+        _log.info('                        to target directory:\t'+Fore.MAGENTA+'%s', target)
+    with ThreadPoolExecutor(max_workers=max(1, probe_workers), thread_name_prefix='probe') as executor:
+        durations = [ executor.submit(get_wav_duration, _log, source_file) if source_file else None
+                for source_file in source_files ]
+        for i in range(file_count):
+            source_file = source_files[i]
+            if source_file is None: # an empty memory
+                continue
+            memory = '{:02d}'.format(i+1)
+            target_files = { target: os.path.join(get_memory_directory(target, i+1), os.path.basename(source_file))
+                    for target in targets }
+            if dry_run:
+                for target_file in target_files.values():
+                    log_dry_run(_log, source_file, target_file)
+                continue
+            try:
+                stat = os.stat(source_file)
+                content_hash, statuses = fan_out_memory(_log, source_file, list(target_files.values()), conversions, verify,
+                        gains=gains, trace=trace, copy_options=copy_options, workers=probe_workers)
+            except OSError as e:
+                _log.error('Error: %s - %s.', e.filename, e.strerror)
+                continue
+            except ValueError as e:
+                _log.error('Error converting %s: %s', source_file, e)
+                continue
+            for target, target_file in target_files.items():
+                status = statuses[target_file]
+                if isinstance(status, OSError):
+                    _log.error('Error: %s - %s.', status.filename, status.strerror)
+                    continue
+                if target in journals:
+                    journals[target].complete(memory, source_file, stat, content_hash, status)
+                catalogs[target][memory] = ( durations[i].result(), target_file, content_hash, status )
+    return catalogs
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def reorder_memories(_log, target, source_files, manifest, gains=None, trace=NULL_TRACE, dry_run=False):
+    '''
+    Moves each memory of the target that, according to the manifest, holds
+    a source file now assigned to a different memory, renaming its file
+    rather than copying it again, and updates the manifest to match. Any
+    cycle of moves passes through a temporary directory. Whatever is in a
+    memory moved into is not assigned anywhere, so is deleted. The manifest
+    is saved after each rename, so an interrupted reorder leaves it true to
+    the target; whatever an interrupted reorder left in the temporary
+    directory is deleted, to be copied again. If 'dry_run' is True the
+    moves are only listed, and the target and manifest left as they are.
+    A memory whose file was written with other than the source file's gain
+    in the 'gains' dictionary isn't moved. Returns a dictionary of each
+    memory moved (or for a dry run, that would have been) to the memory it
+    was moved to.
+    '''
+    gains = gains or {}
+    temp_dir = os.path.join(target, REORDER_DIRECTORY)
+    if manifest.get(REORDER_DIRECTORY) or os.path.isdir(temp_dir):
+        delete_memory_files(_log, temp_dir, trace=trace, dry_run=dry_run)
+        if not dry_run:
+            manifest.remove(REORDER_DIRECTORY)
+            manifest.save()
+            if os.path.isdir(temp_dir) and not os.listdir(temp_dir):
+                os.rmdir(temp_dir)
+    moves = {}
+    for i, source_file in enumerate(source_files):
+        if source_file is None:
+            continue
+        name = os.path.basename(source_file)
+        gain = gains.get(source_file)
+        if manifest.is_current('{:02d}'.format(i+1), source_file, os.path.join(get_memory_directory(target, i+1), name), gain=gain):
+            continue
+        stat = os.stat(source_file)
+        for held in manifest.memories():
+            entry = manifest.get(held)
+            if not held.isdigit():
+                continue
+            # compare names and sizes before anything that might read the file
+            if int(held) in moves or entry['source'] != name or entry['size'] != stat.st_size:
+                continue
+            if manifest.is_current(held, source_file, os.path.join(get_memory_directory(target, int(held)), name), stat, gain):
+                moves[int(held)] = i+1
+                break
+    if not moves:
+        return moves
+    def locate(memory):
+        # the manifest key and directory of a memory, or of the temporary directory
+        if memory == REORDER_DIRECTORY:
+            return memory, temp_dir
+        return '{:02d}'.format(memory), get_memory_directory(target, memory)
+    # the file held by each memory as the renames are made, as a dry run leaves the manifest as it was
+    names = { memory: manifest.get('{:02d}'.format(memory))['file'] for memory in moves }
+    for from_memory, to_memory in plan_renames(moves, REORDER_DIRECTORY):
+        from_key, from_dir = locate(from_memory)
+        to_key, to_dir = locate(to_memory)
+        name = names.pop(from_memory)
+        names[to_memory] = name
+        if not dry_run or to_memory not in moves: # a dry run hasn't vacated a memory moved from
+            delete_memory_files(_log, to_dir, trace=trace, dry_run=dry_run)
+        _log.info('moving:\t'+Fore.WHITE+'%s'+Fore.MAGENTA+' → %s', os.path.join(from_dir, name), to_dir)
+        if dry_run:
+            continue
+        manifest.remove(to_key)
+        make_memory_directory(to_dir, trace)
+        with trace.file('rename', os.path.join(from_dir, name)):
+            os.rename(os.path.join(from_dir, name), os.path.join(to_dir, name))
+        manifest.move(from_key, to_key)
+        manifest.save()
+    if dry_run:
+        return moves
+    # remove the temporary directory and any memory left empty
+    for vacated in [ temp_dir ] + [ get_memory_directory(target, memory) for memory in moves if memory not in moves.values() ]:
+        if os.path.isdir(vacated) and not os.listdir(vacated):
+            os.rmdir(vacated)
+    return moves
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def count_files(source_files):
+    '''
+    Returns the number of source files assigned a memory, i.e., less any empty memories.
+    '''
+    return sum(1 for source_file in source_files if source_file is not None)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def sync_files(_log, source, source_files, target, probe_workers=PROBE_WORKERS, conversions=None, verify=False, gains=None, trace=NULL_TRACE,
+        copy_options=None, dry_run=False):
+    '''
+    Synchronises the memories of the target with the source files, using the
+    manifest written to the target by the previous sync to copy, convert,
+    replace or delete only those memories that have changed. Returns a
+    catalog of all memories as for transfer_files(), with a status of
+    UNCHANGED for those memories not written. A memory is also rewritten
+    if its file's gain in the 'gains' dictionary has changed. If 'dry_run'
+    is True, what would be written, moved or deleted is only listed, and
+    neither the target nor its manifest is modified; the catalog then holds
+    only the memories already current.
+    '''
+    catalog = {}
+    conversions = conversions or {}
+    gains = gains or {}
+    manifest = Manifest(target)
+    file_count = len(source_files)
+    copied = 0
+    unchanged = 0
+    _log.info('syncing %d files from source directory:\t'+Fore.WHITE+'%s', count_files(source_files), source)
+    _log.info('                    to target directory:\t'+Fore.MAGENTA+'%s', target)
+    moves = {}
+    try:
+        # a sync never resumes a copy, so any partial files are only taking up space
+        delete_partial_files(_log, target, trace, dry_run)
+        # memories already on the target but assigned elsewhere are moved, not copied
+        moves = reorder_memories(_log, target, source_files, manifest, gains, trace, dry_run)
+    except OSError as e:
+        # whatever wasn't moved is copied instead
+        _log.error('Error: %s - %s.', e.filename, e.strerror)
+    with ThreadPoolExecutor(max_workers=max(1, probe_workers), thread_name_prefix='probe') as executor:
+        durations = [ executor.submit(get_wav_duration, _log, source_file) if source_file else None
+                for source_file in source_files ]
+        for i in range(file_count):
+            source_file = source_files[i]
+            if source_file is None: # an empty memory
+                continue
+            memory = '{:02d}'.format(i+1)
+            if dry_run and i+1 in moves.values():
+                # a dry run leaves the manifest as it was, so this memory isn't yet current
+                continue
+            try:
+                memory_dir = get_memory_directory(target, i+1)
+                target_file = os.path.join(memory_dir, os.path.basename(source_file))
+                stat = os.stat(source_file)
+                gain = gains.get(source_file)
+                if manifest.is_current(memory, source_file, target_file, stat, gain):
+                    _log.info('unchanged:\t'+Fore.WHITE+'%s', source_file)
+                    content_hash, status = manifest.get(memory)['hash'], UNCHANGED
+                    unchanged += 1
+                elif dry_run:
+                    if i+1 not in moves: # otherwise its file would have been moved away
+                        delete_memory_files(_log, memory_dir, keep=os.path.basename(target_file), trace=trace, dry_run=True)
+                    log_dry_run(_log, source_file, target_file)
+                    copied += 1
+                    continue
+                else:
+                    delete_memory_files(_log, memory_dir, keep=os.path.basename(target_file), trace=trace)
+                    content_hash, status = write_memory(_log, source_file, target_file, conversions, verify, gains=gains, trace=trace,
+                            copy_options=copy_options)
+                    if status == MISMATCH:
+                        # not recorded, so the next sync will copy it again
+                        manifest.remove(memory)
+                    else:
+                        manifest.put(memory, source_file, target_file, content_hash, stat, gain)
+                    # saved as each memory is written, so an interrupted sync loses nothing
+                    manifest.save()
+                    copied += 1
+                catalog[memory] = ( durations[i].result(), target_file, content_hash, status )
+            except OSError as e:
+                manifest.remove(memory)
+                _log.error('Error: %s - %s.', e.filename, e.strerror)
+            except ValueError as e:
+                manifest.remove(memory)
+                _log.error('Error converting %s: %s', source_file, e)
+    # delete memories no longer in the source list, or now empty
+    deleted = 0
+    for i in range(1, 100):
+        if i <= file_count and source_files[i-1] is not None:
+            continue
+        memory = '{:02d}'.format(i)
+        memory_dir = get_memory_directory(target, i)
+        if dry_run and i in moves:
+            # its file would have been moved, not deleted
+            continue
+        if manifest.get(memory) or os.path.isdir(memory_dir):
+            try:
+                if delete_memory_files(_log, memory_dir, trace=trace, dry_run=dry_run) > 0:
+                    deleted += 1
+                if not dry_run:
+                    manifest.remove(memory)
+            except OSError as e:
+                _log.error('Error: %s - %s.', e.filename, e.strerror)
+    if dry_run:
+        _log.info('sync complete (dry run): %d to copy, %d to move, %d unchanged, %d memories to clear.',
+                copied, len(moves), unchanged, deleted)
+        return catalog
+    manifest.save()
+    _log.info('sync complete: %d copied, %d moved, %d unchanged, %d memories cleared.',
+            copied, len(moves), unchanged - len(moves), deleted)
+    return catalog
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def pull_memories(_log, target, archive, rehash=False, copy_options=None, trace=NULL_TRACE):
+    '''
+    Pulls the memories of the target (WAVE) directory into the Archive,
+    reading only what is needed to find those new or changed since the last
+    pull. A file whose size and modification time are unchanged has only a
+    sample of it read to confirm it's unchanged (unless 'rehash' is True);
+    any other is copied into the archive and hashed in the same read, and
+    kept only if the archive doesn't already hold its content. The
+    index is saved as each file is pulled, so an interrupted pull loses
+    nothing. A snapshot is added to the archive if the memories differ from
+    those of the latest snapshot.
+
+    Returns the snapshot directory (or None if nothing had changed) and a
+    list of records of each file as for get_catalog_records(), its status
+    one of NEW, CHANGED or UNCHANGED. The target of each record is its
+    link in the snapshot added, or if nothing had changed in the latest
+    snapshot, unless the archive doesn't support hard links.
+    '''
+    _log.info('pulling memories from target directory:\t'+Fore.MAGENTA+'%s', target)
+    _log.info('                       to archive directory:\t'+Fore.WHITE+'%s', archive.root)
+    previous = archive.latest()
+    memories = {}
+    records  = {}
+    pulled   = {} # the key of the file pulled from each memory
+    target_files = sorted(walk_wav_files(target, prune=is_hidden))
+    for target_file in target_files:
+        match = MEMORY_DIRECTORY_PATTERN.match(target_file.parent.name)
+        if not match:
+            continue
+        key = '{}/{}'.format(target_file.parent.name, target_file.name)
+        memory = int(match.group(1))
+        if memory in pulled:
+            # the RC-5 plays only one file of a memory, and the catalog records one
+            _log.warning('skipped extra file of memory %d (already pulled %s):\t'+Fore.WHITE+'%s', memory, pulled[memory], target_file)
+            continue
+        try:
+            stat = os.stat(target_file)
+            entry = None if rehash else archive.identify(key, stat)
+            content_hash = None
+            if entry:
+                with trace.file('sample', target_file) as event:
+                    sample = sample_hash(target_file, stat.st_size)
+                    event['bytes'] = min(stat.st_size, SAMPLE_BLOCKS * SAMPLE_BYTES)
+                if sample == entry['sample']:
+                    content_hash = entry['hash']
+            if content_hash:
+                _log.info('unchanged:\t'+Fore.WHITE+'%s', target_file)
+            else:
+                _log.info('pulling:\t'+Fore.WHITE+'%s', target_file)
+                incoming = archive.incoming_path('pull-{}.wav'.format(match.group(1)))
+                with trace.file('copy', target_file) as event:
+                    content_hash = copy_file(target_file, incoming, **( copy_options or {} ))
+                    event['bytes'] = stat.st_size
+                _log.info('…to archive:\t'+Fore.WHITE+'%s'+Fore.CYAN+' (%s)', archive.object_path(content_hash), format_throughput(event))
+                if not archive.add(incoming, content_hash):
+                    _log.info('content already archived:\t'+Fore.WHITE+'%s', content_hash)
+                # sampled from the archived copy, which has the same content
+                sample = sample_hash(archive.object_path(content_hash), stat.st_size)
+            archive.remember(key, stat, sample, content_hash)
+            archive.save()
+        except OSError as e:
+            _log.error('Error: %s - %s.', e.filename, e.strerror)
+            continue
+        status = NEW if key not in previous else UNCHANGED if previous[key]['hash'] == content_hash else CHANGED
+        pulled[memory] = key
+        memories[key] = { 'memory': memory, 'name': target_file.name, 'size': stat.st_size, 'hash': content_hash }
+        try:
+            info = WavInfo(archive.object_path(content_hash))
+            duration, wav_format = info.duration, str(info)
+        except ( WavFormatError, OSError ) as e:
+            _log.warning('could not read WAV header of %s: %s', target_file, e)
+            duration, wav_format = 0.0, '-'
+        records[key] = {
+            'memory':   memory,
+            'name':     target_file.name,
+            'source':   os.fspath(target_file),
+            'target':   archive.object_path(content_hash),
+            'size':     stat.st_size,
+            'duration': duration,
+            'format':   wav_format,
+            'hash':     content_hash,
+            'status':   status
+        }
+    archive.forget(memories)
+    archive.save()
+    removed = [ key for key in previous if key not in memories ]
+    for key in removed:
+        _log.info('no longer on target:\t'+Fore.WHITE+'%s', key)
+    if { key: memory['hash'] for key, memory in memories.items() } == { key: memory['hash'] for key, memory in previous.items() }:
+        _log.info('nothing has changed since the last pull.')
+        snapshot = None
+        links = archive.latest_directory()
+    else:
+        snapshot = links = archive.snapshot(memories, target)
+        if not archive.links:
+            _log.warning('the archive directory does not support hard links, so the snapshot is only recorded in its %s',
+                    SNAPSHOT_FILENAME)
+        _log.info('added snapshot:\t'+Fore.WHITE+'%s', snapshot)
+    # the records refer to the links of the snapshot matching the memories, where they were made
+    for key, record in records.items():
+        link_path = os.path.join(links, *key.split('/'))
+        if os.path.isfile(link_path):
+            record['target'] = link_path
+    return snapshot, list(records.values())
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def get_catalog_records(catalog, source_files, infos, size, levels=None):
+    '''
+    Returns the catalog of a transfer as a list of records for the catalog
+    database, built from what is already known of each file: its WavInfo,
+    its size on the target, as returned by the 'size' function (e.g.,
+    TransferPlan.size), and its levels if found in the 'levels' dictionary.
+    No file is read or stat'ed again.
+    '''
+    records = []
+    levels = levels or {}
+    for memory, entry in catalog.items():
+        source_file = source_files[int(memory)-1]
+        info = infos[source_file]
+        file_levels = levels.get(source_file) or {}
+        records.append({
+            'memory':   int(memory),
+            'name':     os.path.basename(source_file),
+            'source':   os.fspath(source_file),
+            'target':   entry[1],
+            'size':     size(source_file),
+            'duration': info.duration,
+            'format':   str(info),
+            'hash':     entry[2],
+            'status':   entry[3],
+            'peak':     file_levels.get('peak'),
+            'rms':      file_levels.get('rms'),
+            'loudness': file_levels.get('loudness')
+        })
+    return records
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def format_level(level):
+    '''
+    Returns a level in dB to one decimal place, or '-' if unknown (e.g., silence).
+    '''
+    return '{:.1f}'.format(level) if level is not None else '-'
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def analyse_levels(_log, source_files, infos, conversions, normalise=None, trace=NULL_TRACE, workers=None):
+    '''
+    Measures the peak, RMS level and loudness of each source file on a pool
+    of 'workers' processes (by default one per CPU), returning a dictionary of each file to its levels, and
+    the conversions and a dictionary of linear gains with which to write
+    the files. If 'normalise' is a loudness in LUFS, each file is given the
+    gain that brings it to that loudness without its peak exceeding -1dBFS;
+    files in the RC-5's native format that need a gain are then converted
+    rather than copied.
+    '''
+    # numpy is only imported once an analysis is needed, not at startup
+    from core.analysis import analyse_files, normalising_gain
+    with trace.phase('analyse'):
+        results = analyse_files([ os.fspath(f) for f in source_files ], workers)
+    levels = dict(zip(source_files, results))
+    gains = {}
+    for source_file in source_files:
+        file_levels = levels[source_file] or { 'peak': None, 'rms': None, 'loudness': None }
+        _log.info('levels:\t'+Fore.WHITE+'peak %s dBFS, rms %s dBFS, loudness %s LUFS'+Fore.CYAN+' %s',
+                format_level(file_levels['peak']), format_level(file_levels['rms']), format_level(file_levels['loudness']),
+                source_file)
+        if normalise is not None:
+            gain = normalising_gain(levels[source_file], normalise)
+            if gain:
+                gains[source_file] = gain
+    if gains:
+        conversions = dict(conversions)
+        for source_file in gains:
+            conversions.setdefault(source_file, infos[source_file])
+        _log.info('normalising %d files to:\t'+Fore.WHITE+'%.1f LUFS', len(gains), normalise)
+    return levels, conversions, gains
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def add_waveforms(_log, records, infos, trace=NULL_TRACE):
+    '''
+    Adds a 'waveform' sparkline to each catalog record. The envelope of each
+    file is cached by its content hash, so a file is only read again if its
+    content has changed; the cache is bounded, the least recently used
+    envelopes being evicted.
+    '''
+    # numpy is only imported once an envelope is needed, not at startup
+    from core.envelope import compute_envelope, sparkline, ENVELOPE_VERSION
+    cache = ContentCache('envelopes', '.json', max_bytes=ENVELOPE_CACHE_BYTES)
+    computed = 0
+    with trace.phase('waveform'):
+        for record in records:
+            if not record['hash']:
+                continue
+            key = '{}-v{}'.format(record['hash'], ENVELOPE_VERSION)
+            cached_file = cache.get(key)
+            if cached_file:
+                with open(cached_file, 'r') as f:
+                    envelope = json.load(f)
+            else:
+                info = infos[Path(record['source'])]
+                with trace.file('envelope', record['source']) as event:
+                    envelope = compute_envelope(info)
+                    event['bytes'] = info.data_size
+                cache.put(key, json.dumps(envelope).encode('utf-8'))
+                computed += 1
+            record['waveform'] = sparkline(envelope)
+    cache.prune()
+    _log.info('waveforms:\t'+Fore.WHITE+'%d computed, %d cached', computed, len(records) - computed)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def scan_source(_log, source, index_file=None, dedupe=None, trace=NULL_TRACE, workers=PROBE_WORKERS):
+    '''
+    Finds the WAV files in the source directory tree, checking their format
+    as they're found and stopping once past the RC-5's limit. Returns a
+    tuple of the source files sorted by filename, a dictionary of each file
+    to its WavInfo, and a dictionary of those files to be converted, or
+    None if there are too many source files.
+
+    If an 'index_file' is provided, the listings of the source directories
+    are cached in it so that unchanged directories aren't listed again. If
+    'dedupe' is True, files whose audio is identical to that of a file
+    earlier in the sorted list are skipped before memories are assigned, so
+    they don't count against the limit; if 'report', they're only reported.
+    The files are checked, and hashed to find duplicates, on a pool of
+    'workers' threads.
+    '''
+    index = DirectoryIndex(index_file) if index_file else None
+    skip_duplicates = dedupe and dedupe != 'report'
+    with trace.phase('scan'):
+        accepted, convertible, rejected = validate_files(_log, walk_wav_files(source, prune=is_hidden, index=index),
+                probe_workers=workers, limit=None if skip_duplicates else MAX_MEMORIES, trace=trace)
+
+    # convertible files are converted to the RC-5's format as they're transferred
+    infos = dict(accepted + convertible)
+    conversions = dict(convertible)
+    source_files = list(infos.keys())
+
+    # sort list by filename
+    with trace.phase('sort'):
+        source_files.sort(key=get_filename)
+
+    # find files with the same audio, keeping the first of each by filename
+    if dedupe:
+        with trace.phase('dedupe'):
+            duplicates = find_duplicates([ ( f, infos[f] ) for f in source_files ], hash_workers=workers)
+        for group in duplicates:
+            _log.warning('duplicate audio:\t'+Fore.WHITE+'%s'+Fore.YELLOW+' (same as %s)',
+                    ', '.join(os.fspath(f) for f in group[1:]), group[0])
+        if skip_duplicates:
+            skipped = { f for group in duplicates for f in group[1:] }
+            source_files = [ f for f in source_files if f not in skipped ]
+            _log.info('skipped %d duplicate files:\t'+Fore.WHITE+'%.1fMB, %s total duration', len(skipped),
+                    sum(infos[f].file_size for f in skipped) / 1e6, format_duration(sum(infos[f].duration for f in skipped)))
+
+    # validate: RC-5 has limit of 99 memories
+    if len(source_files) > MAX_MEMORIES:
+        return None
+    if index:
+        index.save()
+    for f3, reason in rejected:
+        _log.warning('rejected:\t'+Fore.WHITE+'%s', reason)
+    for f4, info in convertible:
+        if f4 in source_files:
+            _log.info('will convert (%s):\t'+Fore.WHITE+'%s', info, f4)
+    _log.info('found %d source files (sorted):', len(source_files))
+    for f2 in source_files:
+        _log.info('source:\t'+Fore.WHITE+'%s', f2)
+    return source_files, infos, conversions
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def assign_source_files(_log, source, source_files, playlist=None, pins=None):
+    '''
+    Assigns the sorted source files to memories in the order of the playlist
+    file and the pins (as 'MEMORY:NAME,...'), if either is provided, as for
+    assign_memories(). Returns the list of source files by memory, with None
+    for any empty memory, or None if the playlist or pins are invalid.
+    '''
+    if not playlist and not pins:
+        return source_files
+    try:
+        # a line naming a source file is never taken as a pin, whatever its name
+        known = { name for source_file in source_files
+                for name in ( os.path.basename(source_file), os.path.relpath(source_file, source) ) }
+        order, playlist_pins = read_playlist(playlist, MAX_MEMORIES, known) if playlist else ( [], [] )
+        assigned = assign_memories(source, source_files, order=order,
+                pins=playlist_pins + ( parse_pins(pins) if pins else [] ), memories=MAX_MEMORIES)
+    except OSError as e:
+        _log.error('Error: %s - %s.', e.filename, e.strerror)
+        return None
+    except ValueError as e:
+        _log.error('invalid playlist or pins: %s', e)
+        return None
+    _log.info('assigned %d source files to memories:', count_files(assigned))
+    for i, source_file in enumerate(assigned):
+        _log.info('memory %02d:\t'+Fore.WHITE+'%s', i+1, source_file or '-')
+    return assigned
+
+#EOF
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, json, time
+from pathlib import Path
+
+INDEX_VERSION = 1
+# a directory modified this close to its scan may change again within the
+# same mtime tick (2 seconds on FAT), so its cached listing isn't trusted
+MTIME_RESOLUTION_NS = 2 * 1000 * 1000 * 1000
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class DirectoryIndex(object):
+    '''
+    An on-disk cache of directory listings keyed by directory path and
+    modification time. A directory whose mtime is unchanged since it was
+    indexed has the same entries, so it need not be scanned again.
+
+    :param path:  the path to the JSON index file
+    '''
+    def __init__(self, path):
+        self._path    = path
+        self._dirs    = {}
+        self._visited = set()
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self._dirs = data.get('dirs', {})
+            except ValueError:
+                pass # a corrupt index is simply rebuilt
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def get(self, directory, mtime_ns):
+        '''
+        Returns the cached (files, dirs) listing of the directory if its
+        mtime is unchanged, otherwise None.
+        '''
+        self._visited.add(directory)
+        entry = self._dirs.get(directory)
+        if entry and entry['mtime'] == mtime_ns and entry['scanned'] - mtime_ns > MTIME_RESOLUTION_NS:
+            return entry['files'], entry['dirs']
+        return None
+
+    def put(self, directory, mtime_ns, files, dirs):
+        self._visited.add(directory)
+        self._dirs[directory] = {
+            'mtime':   mtime_ns,
+            'scanned': time.time_ns(),
+            'files':   files,
+            'dirs':    dirs
+        }
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def save(self):
+        '''
+        Writes the index, keeping only the directories visited since it was
+        loaded so that removed directories don't accumulate.
+        '''
+        dirs = { d: e for d, e in self._dirs.items() if d in self._visited }
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({ 'version': INDEX_VERSION, 'dirs': dirs }, f)
+        os.replace(tmp_path, self._path)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def list_directory(directory, index):
+    '''
+    Returns the sorted WAV file names and subdirectory names of the
+    directory, from the index (if not None) if its listing is unchanged.
+    '''
+    if index is not None:
+        key = os.path.abspath(directory)
+        mtime_ns = os.stat(directory).st_mtime_ns
+        cached = index.get(key, mtime_ns)
+        if cached is not None:
+            return cached
+    files = []
+    dirs  = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            # DirEntry caches the type from the directory read, so there's no stat
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.name)
+            elif entry.name[-4:].lower() == '.wav' and entry.is_file():
+                files.append(entry.name)
+    files.sort()
+    dirs.sort()
+    if index is not None:
+        index.put(key, mtime_ns, files, dirs)
+    return files, dirs
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def walk_wav_files(root, prune=None, limit=None, index=None):
+    '''
+    Yields the Path of each WAV file (by case-insensitive extension) found
+    in the directory tree beneath 'root', as it is found.
+
+    :param root:   the root directory
+    :param prune:  an optional function returning True for the name of any
+                   directory that should not be descended into
+    :param limit:  if provided, stop once this many files have been yielded
+    :param index:  an optional DirectoryIndex used to skip unchanged directories
+    '''
+    count = 0
+    stack = [ os.fspath(root) ]
+    while stack:
+        directory = stack.pop()
+        files, dirs = list_directory(directory, index)
+        for name in files:
+            yield Path(os.path.join(directory, name))
+            count += 1
+            if limit is not None and count >= limit:
+                return
+        for name in reversed(dirs):
+            if prune is None or not prune(name):
+                stack.append(os.path.join(directory, name))
+
+#EOF
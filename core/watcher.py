@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, time
+
+from core.walker import MTIME_RESOLUTION_NS, list_directory
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class SourceWatcher(object):
+    '''
+    Detects changes to the WAV files in a directory tree by comparing
+    snapshots of it. Each snapshot stats every directory but lists again
+    only those whose mtime has changed, since a file added, removed or
+    renamed changes the mtime of its directory. The WAV files themselves
+    are stat'ed to catch a file rewritten in place.
+
+    :param root:   the root directory
+    :param prune:  an optional function returning True for the name of any
+                   directory that should not be descended into
+    '''
+    def __init__(self, root, prune=None):
+        self._root  = os.fspath(root)
+        self._prune = prune
+        self._dirs  = {}
+        self._files = {}
+        self.poll()
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def _listing(self, directory):
+        '''
+        Returns the mtime and (files, dirs) listing of the directory, from
+        the previous snapshot if its mtime is unchanged.
+        '''
+        mtime_ns = os.stat(directory).st_mtime_ns
+        entry = self._dirs.get(directory)
+        # a directory modified within the same mtime tick may change again unseen
+        if entry and entry[0] == mtime_ns and time.time_ns() - mtime_ns > MTIME_RESOLUTION_NS:
+            return entry
+        files, dirs = list_directory(directory, None)
+        return mtime_ns, files, dirs
+
+    def poll(self):
+        '''
+        Takes a new snapshot of the tree, returning the set of paths of the
+        WAV files added, removed or modified since the previous one.
+        '''
+        dirs  = {}
+        files = {}
+        stack = [ self._root ]
+        while stack:
+            directory = stack.pop()
+            try:
+                dirs[directory] = entry = self._listing(directory)
+            except OSError:
+                continue # removed since its parent was listed
+            for name in entry[1]:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = ( stat.st_size, stat.st_mtime_ns )
+            for name in entry[2]:
+                if self._prune is None or not self._prune(name):
+                    stack.append(os.path.join(directory, name))
+        changed = { path for path in files.keys() | self._files.keys() if files.get(path) != self._files.get(path) }
+        self._dirs  = dirs
+        self._files = files
+        return changed
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def mounted_device(directory):
+    '''
+    Returns the ID of the device holding the directory, or None if it does
+    not exist (e.g., the RC-5 is not mounted). A different ID means the
+    directory is on a newly mounted device.
+    '''
+    try:
+        stat = os.stat(directory)
+    except OSError:
+        return None
+    return stat.st_dev if os.path.isdir(directory) else None
+
+#EOF
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+
+import os, struct
+
+# RIFF format tags
+WAVE_FORMAT_PCM        = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# the native format of the RC-5: stereo, 44.1kHz, 32 bit float
+RC5_CHANNELS      = 2
+RC5_SAMPLE_RATE   = 44100
+RC5_SAMPLE_FORMAT = 'float32'
+# sample formats that can be converted to the native format
+CONVERTIBLE_SAMPLE_FORMATS = ( 'uint8', 'int16', 'int24', 'int32', 'float32', 'float64' )
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class WavFormatError(ValueError):
+    '''
+    Raised when a file is not a readable RIFF/WAVE file.
+    '''
+    pass
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class WavInfo(object):
+    '''
+    The header information of a WAV file, obtained by reading only the
+    RIFF chunk headers and the 'fmt ' chunk, never the sample data. The
+    cost of a probe is therefore constant regardless of the file length.
+
+    :param path:  the path to the WAV file
+    '''
+    def __init__(self, path):
+        self._path            = path
+        self._format_tag      = None
+        self._channels        = None
+        self._sample_rate     = None
+        self._block_align     = None
+        self._bits_per_sample = None
+        self._data_offset     = None
+        self._data_size       = None
+        self._file_size       = None
+        with open(path, 'rb') as f:
+            self._parse(f, os.fstat(f.fileno()).st_size)
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def _parse(self, f, file_size):
+        self._file_size = file_size
+        header = f.read(12)
+        if len(header) < 12 or header[0:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise WavFormatError('not a RIFF/WAVE file: {}'.format(self._path))
+        pos = 12
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+            pos += 8
+            if chunk_id == b'fmt ':
+                self._parse_fmt(f.read(min(chunk_size, 40)))
+            elif chunk_id == b'data':
+                self._data_offset = pos
+                # streaming writers may leave the size unset or too large
+                self._data_size = min(chunk_size, file_size - pos)
+            if self._format_tag is not None and self._data_offset is not None:
+                break
+            # chunks are word-aligned: odd-sized chunks carry a pad byte
+            pos += chunk_size + ( chunk_size & 1 )
+        if self._format_tag is None:
+            raise WavFormatError('missing fmt chunk: {}'.format(self._path))
+        if self._data_offset is None:
+            raise WavFormatError('missing data chunk: {}'.format(self._path))
+        if self._block_align == 0 or self._sample_rate == 0:
+            raise WavFormatError('invalid fmt chunk: {}'.format(self._path))
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def _parse_fmt(self, fmt):
+        if len(fmt) < 16:
+            raise WavFormatError('truncated fmt chunk: {}'.format(self._path))
+        ( self._format_tag, self._channels, self._sample_rate, _byte_rate,
+                self._block_align, self._bits_per_sample ) = struct.unpack('<HHIIHH', fmt[0:16])
+        if self._format_tag == WAVE_FORMAT_EXTENSIBLE:
+            # cbSize, wValidBitsPerSample, dwChannelMask, then the SubFormat
+            # GUID, whose first two bytes are the actual format tag
+            if len(fmt) < 40:
+                raise WavFormatError('truncated WAVE_FORMAT_EXTENSIBLE chunk: {}'.format(self._path))
+            self._format_tag = struct.unpack('<H', fmt[24:26])[0]
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def file_size(self):
+        '''
+        Return the size of the file in bytes, as it was when the header was read.
+        '''
+        return self._file_size
+
+    @property
+    def format_tag(self):
+        '''
+        Return the format tag, resolved from the SubFormat GUID for
+        WAVE_FORMAT_EXTENSIBLE files.
+        '''
+        return self._format_tag
+
+    @property
+    def channels(self):
+        return self._channels
+
+    @property
+    def sample_rate(self):
+        return self._sample_rate
+
+    @property
+    def bits_per_sample(self):
+        return self._bits_per_sample
+
+    @property
+    def block_align(self):
+        return self._block_align
+
+    @property
+    def data_offset(self):
+        '''
+        Return the byte offset of the sample data within the file.
+        '''
+        return self._data_offset
+
+    @property
+    def data_size(self):
+        '''
+        Return the size of the sample data in bytes.
+        '''
+        return self._data_size
+
+    @property
+    def frames(self):
+        '''
+        Return the number of sample frames (one sample for each channel).
+        '''
+        return self._data_size // self._block_align
+
+    @property
+    def duration(self):
+        '''
+        Return the duration of the file in seconds, as a float.
+        '''
+        return self.frames / self._sample_rate
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def sample_format(self):
+        '''
+        Return the sample format as a short string, e.g., 'float32' or
+        'int24', or 'unknown' for unsupported format tags.
+        '''
+        if self._format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            return 'float{}'.format(self._bits_per_sample)
+        elif self._format_tag == WAVE_FORMAT_PCM:
+            if self._bits_per_sample == 8:
+                return 'uint8'
+            return 'int{}'.format(self._bits_per_sample)
+        return 'unknown'
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    @property
+    def is_rc5_native(self):
+        '''
+        Return True if the file is in the RC-5's native format.
+        '''
+        return self._channels == RC5_CHANNELS and self._sample_rate == RC5_SAMPLE_RATE \
+                and self.sample_format == RC5_SAMPLE_FORMAT
+
+    @property
+    def is_convertible(self):
+        '''
+        Return True if the file is not in the RC-5's native format but its
+        sample format and channel count can be converted to it.
+        '''
+        return not self.is_rc5_native and self._channels in ( 1, 2 ) \
+                and self.sample_format in CONVERTIBLE_SAMPLE_FORMATS
+
+    # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+    def __str__(self):
+        return '{} {}ch {}Hz {:.2f}s'.format(self.sample_format, self._channels, self._sample_rate, self.duration)
+
+#EOF
@@ -20,44 +20,85 @@ It looks to the current working directory for a .rc5tx.prefs file.'''
 #
 # author:   Ichiro Furusato
 # created:  2023-03-19
-# modified: 2023-03-23
+# modified: 2026-10-17
 # 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-import sys, os, signal, traceback, json, shutil, calendar, time
+import sys, os, signal, traceback, json, time
 from pathlib import Path
 from datetime import datetime
-import scipy
-from scipy.io import wavfile
-from colorama import init, Fore, Style
+from colorama import init, Fore
 init()
 
-import warnings
-warnings.filterwarnings(action='ignore', category=wavfile.WavFileWarning) 
-
 from core.logger import Logger, Level
-
-# if DRY_RUN=True no files are modified
-DRY_RUN = False
-# if NO_DURATION_STATS=True then don't bother getting the WAV file duration
-NO_DURATION_STATS = False
+from core.catalog import Catalog, EXPORT_FORMATS
+from core.watcher import SourceWatcher, mounted_device
+from core.transfer import MISMATCH, is_hidden, format_duration, format_throughput, format_level, pull_memories
+from core.copier import COPY_METHODS, TRANSFER_BLOCK_SIZE
+from core.archive import Archive
+from core.trace import Trace
+
+# the interval between polls of the source and target with the 'watch' option,
+# and the time neither must have changed before a sync, both in seconds
+WATCH_INTERVAL = 2.0
+WATCH_SETTLE   = 5.0
+
+# command line options, as '--name' or '--name=value'
+OPTIONS = {
+    'sync':      'copy, replace or delete only the memories changed since the last sync',
+    'index':     'cache the source directory listings so unchanged directories aren\'t rescanned',
+    'verify':    'read back each file written to confirm it matches its source',
+    'resume':    'resume an interrupted transfer without copying completed memories again',
+    'export':    'export the catalog of the last run (or of --run=N) as md, json or csv, e.g., --export=csv',
+    'run':       'the run whose catalog is exported with --export',
+    'find':      'list the runs that wrote a memory number, file name or content hash, e.g., --find=37',
+    'dedupe':    'skip files whose audio duplicates an earlier file (or with --dedupe=report, only report them)',
+    'analyse':   'measure the peak, RMS level and loudness of each file, adding them to the catalog',
+    'normalise': 'adjust the gain of each file to a loudness in LUFS as it is written, e.g., --normalise=-16',
+    'waveform':  'show a sparkline of the waveform of each file in the catalog',
+    'playlist':  'assign memories in the order of the files named in a playlist file, e.g., --playlist=set.txt',
+    'pin':       'assign files to specific memories, e.g., --pin=1:intro.wav,37:outro.wav',
+    'watch':     'keep the target synced with the source, syncing whenever either changes or the RC-5 is mounted',
+    'copy':      'copy each file with copy_file_range or sendfile (falling back to a buffer) or a buffer (the default), e.g., --copy=sendfile',
+    'block':     'the size in MB of each block copied (by default, 8), e.g., --block=16',
+    'fsync':     'sync each file to the device as it is written, or all together at the end, e.g., --fsync=file or --fsync=end',
+    'pull':      'back up the memories of the target to an archive directory, copying only those changed, e.g., --pull=~/rc5',
+    'rehash':    'with --pull, read every memory in full rather than only a sample of those that appear unchanged'
+}
 
 # get pref file, from current working directory
 PREF_FILENAME = '.rc5tx.pref'
 PREF_FILE = os.path.join(str(os.getcwd()), PREF_FILENAME)
+# the source directory index used with the 'index' option
+INDEX_FILENAME = '.rc5tx.index'
+INDEX_FILE = os.path.join(str(os.getcwd()), INDEX_FILENAME)
+# the catalog database of every run, in the current working directory
+CATALOG_FILENAME = '.rc5tx.db'
+CATALOG_FILE = os.path.join(str(os.getcwd()), CATALOG_FILENAME)
 
 # execution handler ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def signal_handler(signal, frame):
+def signal_handler(signum, frame, _log=None, engine=None):
+    if engine:
+        # the transfer stops once the file being written is complete, so any
+        # further Ctrl-C while it does is ignored
+        engine.cancel()
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if _log:
+        # write any queued log messages before our own, but don't wait on
+        # a listener that may itself be blocked by the interrupted thread
+        _log.flush(timeout=1.0)
     print('\nsignal handler : INFO  : Ctrl-C caught: exiting…')
+    if engine:
+        print('an interrupted transfer may be continued using the --resume option.')
     print('exit.')
     sys.exit(0)
 
 # write prefs ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def prefs_write(_log, source, target):
+def prefs_write(_log, source, targets):
     _log.info('writing {} file…'.format(PREF_FILE))
     dictionary = {
-        'source': str(source),
-        'target': str(target)
+        'source':  str(source),
+        'targets': [ str(target) for target in targets ]
     }
     json_object = json.dumps(dictionary, indent=4)
     with open(PREF_FILE, 'w') as outfile:
@@ -73,134 +114,329 @@ def prefs_read(_log):
     _log.info('successfully read prefs file.')
     return dictionary
 
-# get filename from path ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def get_filename(path):
-    return path.name
-
-# clean target directory ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def clean_target_directory(_log, target):
-    target_files = []
-    target_list = target.rglob('*')
-    for f in target_list:
-        ext = os.path.splitext(f)[-1].lower()
-        if f.is_file() and ext == '.wav':
-            target_files.append(f)
-    if len(target_files) == 0:
-        _log.info('target directory contained no WAV files.')
-        return True
-    elif input(Fore.RED + 'Delete {} existing WAV files in the target directory. Are you sure? (y/n): '.format(len(target_files))).lower().strip() == 'y':
-        for f in target_files:
-            if DRY_RUN:
-                _log.info('deleting target file (dry run):\t'+Fore.WHITE+'{}'.format(f))
-            else:
-                try:
-                    _log.info('deleting target file:\t'+Fore.WHITE+'{}'.format(f))
-                    os.remove(f)
-                except OSError as e:
-                    _log.error('Error: {} - {}.'.format(e.filename, e.strerror))
-                    return False
-        _log.info('target directory successfully cleaned.')
-        return True
+# parse command line options ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def parse_options(argv):
+    '''
+    Separates '--name' and '--name=value' options from the positional
+    arguments, returning both. An option without a value is set True.
+    '''
+    args = []
+    options = {}
+    for arg in argv:
+        if arg.startswith('--'):
+            name, _, value = arg[2:].partition('=')
+            options[name] = value if value else True
+        else:
+            args.append(arg)
+    return args, options
+
+# format command line options ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def format_options(options):
+    '''
+    The inverse of parse_options(), returning the options as they would be
+    written on the command line, each followed by a space.
+    '''
+    return ''.join('--{} '.format(name) if value is True else '--{}={} '.format(name, value)
+            for name, value in options.items())
+
+# print transfer plan ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def print_plan(_log, plan, sync=False):
+    '''
+    Logs the transfer plan and any problems with it, returning True if the
+    transfer can proceed.
+    '''
+    _log.info('transfer plan:\t'+Fore.WHITE+'{:.1f}MB, {} total duration ({:.1f}MB available on target)'.format(
+            plan.total_bytes / 1e6, format_duration(plan.total_duration), plan.available_bytes / 1e6))
+    if plan.estimated_seconds is not None:
+        _log.info('estimated transfer time:\t'+Fore.WHITE+'{}{} at {:.1f}MB/s'.format(
+                'up to ' if sync else '', format_duration(plan.estimated_seconds), plan.throughput / 1e6))
     else:
-        _log.info('user did not want to clean target directory, will overwrite any existing matching files.')
-        return True
-
-# get length of wave file in seconds ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-
-# function to convert the information into some readable format
-def output_duration(length):
-    hours = length // 3600  # hours
-    length %= 3600
-    mins = length // 60     # minutes
-    length %= 60
-    seconds = length        # seconds
-    return hours, mins, seconds
-
-def get_wav_duration(_log, file):
-    if NO_DURATION_STATS:
-        return '--:--:--'
-    _log.info('getting duration of file: {}…'.format(os.fspath(file)))
-    try:
-        # sample_rate holds the sample rate of the wav file in (sample/sec) format
-        # data is the numpy array that consists of actual data read from the wav file
-        sample_rate, data = wavfile.read(os.fspath(file))
-        len_data = len(data)        # holds length of the numpy array
-        t = len_data / sample_rate  # returns duration but in floats
-        hours, mins, seconds = output_duration(int(t))
-        duration_hms = '{:02d}:{:02d}:{:02d}'.format(hours, mins, seconds)
-#       duration_hms = '{:02d}:{:02d}:{:02d}'.format(hours, mins, seconds)
-        return duration_hms
-    except Exception as e:
-        _log.error('error getting wave length: {}'.format(e))
-        return 'EE:EE:EE'
-
-# transfer files ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def transfer_files(_log, source, source_files, target):
-    catalog = {}
-    file_count = len(source_files)
-    _log.info('transferring {} files from source directory:\t'.format(file_count)+Fore.WHITE+'{}'.format(source))
-    _log.info('                        to target directory:\t'+Fore.MAGENTA+'{}'.format(target))
-    # TODO
-    for i in range(file_count):
-        source_file = source_files[i]
-        _log.info('transferring:\t'+Fore.WHITE+'{}'.format(source_file))
-        try:
-            # ./WAVE/001_1, ./WAVE/002_1, ... ./WAVE/099_1
-            target_dir_name = os.path.join(target, '0{:02d}_1'.format(i+1))
-            target_dir = Path(target_dir_name)
-            if not target_dir.is_dir():
-                os.makedirs(target_dir)
-            # do the deed
-            source_filename = os.path.basename(source_file)
-            duration_s = get_wav_duration(_log, source_file)
-            target_file = os.path.join(target_dir, source_filename)
-            shutil.copy2(source_file, target_file)
-            _log.info('…to directory:\t'+Fore.MAGENTA+'{}'.format(target_dir))
-            catalog['{:02d}'.format(i+1)] = ( duration_s, target_file )
-        except OSError as e:
-            _log.error('Error: {} - {}.'.format(e.filename, e.strerror))
-    return catalog
-
-# get timestamp ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def get_timestamp():
-    # create GMT timestamp as date-time
-    date_time = datetime.fromtimestamp(calendar.timegm(time.gmtime()))
-    return date_time.strftime("%d-%m-%YT%H:%M:%S")
+        _log.info('estimated transfer time:\t'+Fore.WHITE+'unknown (no earlier transfers to this target)')
+    problems = plan.problems()
+    for problem in problems:
+        _log.error(problem)
+    return len(problems) == 0
 
 # print catalog of transferred files ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
-def print_catalog(_log, catalog):
+def print_catalog(_log, records):
+    '''
+    Writes a catalog of files copied to the console.
     '''
-    Writes a catalog of files copied to the console and a timestamped file.
+    # the levels and waveforms are shown only if the files were analysed
+    analysed = any(record.get('peak') is not None for record in records)
+    waveforms = any(record.get('waveform') for record in records)
+    _log.info('catalog of files:\n\n' + Fore.WHITE + '    memory:   size (KB):     duration:     status:     {}{}file:'.format(
+            'peak:     loudness:     ' if analysed else '', '{:<37}'.format('waveform:') if waveforms else ''))
+    _log.flush()
+    for record in records:
+        status = record['status'] or '-'
+        subdirname = os.path.basename(os.path.dirname(record['target']))
+        levels = '{:>5}     {:>9}     '.format(format_level(record.get('peak')), format_level(record.get('loudness'))) if analysed else ''
+        if waveforms:
+            levels += '{:<37}'.format(record.get('waveform') or '-')
+        line = ('    {:<8}  {:>10}      {:>8}   {:>9}     {}{}/{}'.format('{:02d}'.format(record['memory']),
+                int(record['size'] / 1000.0), format_duration(record['duration']), status, levels, subdirname, record['name']))
+        print(( Fore.RED if status == MISMATCH else Fore.WHITE ) + line)
+    print('')
+
+# export catalog ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def export_catalog(_log, export_format, run=None):
     '''
-    # create GMT timestamp as date-time
-    date_time = datetime.fromtimestamp(calendar.timegm(time.gmtime()))
-    # then format as filesystem-safe string
-    timestamp = get_timestamp()
-    fs_timestamp = timestamp.replace(':', '-')
-    catalog_filename = 'catalog-rc5tx-{}.md'.format(fs_timestamp)
-    with open(catalog_filename, 'a') as fout:
-        fout.write('audio file catalog - {}\n--------------------------\n\n'.format(timestamp))
-        fout.write('\n    memory:   size (KB):     duration:     file:\n')
-        _log.info('catalog of files:\n\n' + Fore.WHITE + '    memory:   size (KB):     duration:     file:')
-        for memory, info in catalog.items():
-            duration_s = info[0]
-            filepath = info[1]
-            subdirname = os.path.basename(os.path.dirname(filepath))
-            filename = os.path.basename(filepath)
-            filesize = int(Path(filepath).stat().st_size / 1000.0)
-            line = ('    {:<8}  {:>10}      {:>8}     {}/{}'.format(memory, filesize, duration_s, subdirname, filename))
-            fout.write(line + '\n')
-            print(Fore.WHITE + line)
-        fout.write('\n')
+    Exports the catalog of a run (by default the most recent) from the
+    catalog database to a file in the current directory, as markdown, JSON
+    or CSV.
+    '''
+    if export_format not in EXPORT_FORMATS:
+        _log.error('exit: unsupported export format: {} (expected one of: {})'.format(export_format, ', '.join(EXPORT_FORMATS)))
+        return
+    catalog_db = Catalog(CATALOG_FILE)
+    try:
+        run = int(run) if run else catalog_db.latest_run()
+        records = catalog_db.records(run)
+        if not records:
+            _log.warning('no catalog found for run: {}'.format(run))
+            return
+        catalog_filename = 'catalog-rc5tx-run{}.{}'.format(run, export_format)
+        with open(catalog_filename, 'w', newline='') as fout:
+            Catalog.export(records, export_format, fout)
+        _log.info('wrote catalog of run {} ({} files):\t'.format(run, len(records))+Fore.WHITE+'{}'.format(catalog_filename))
+    finally:
+        catalog_db.close()
+
+# find in catalog ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def find_in_catalog(_log, query):
+    '''
+    Lists the runs that wrote a memory number, file name or content hash,
+    as found in the catalog database.
+    '''
+    catalog_db = Catalog(CATALOG_FILE)
+    try:
+        if query.isdigit() and len(query) <= 2:
+            records = catalog_db.find(memory=int(query))
+        elif len(query) == 32 and all(c in '0123456789abcdef' for c in query):
+            records = catalog_db.find(content_hash=query)
+        else:
+            records = catalog_db.find(name=query)
+    finally:
+        catalog_db.close()
+    _log.info('found {} catalog entries for: '.format(len(records))+Fore.WHITE+'{}'.format(query))
+    if records:
+        _log.info('catalog entries:\n\n' + Fore.WHITE + '    run:    started:                memory:   status:     file:')
+        _log.flush()
+        for record in records:
+            print(Fore.WHITE + '    {:<6}  {:<22}  {:<8}  {:>7}     {}'.format(record['run'], record['started'],
+                    '{:02d}'.format(record['memory']), record['status'] or '-', record['source']))
         print('')
-    _log.info('wrote catalog file: {}'.format(catalog_filename))
+
+# print trace of transfer ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def print_trace(_log, summary):
+    '''
+    Logs where the time of the transfer went, from the summary of a Trace:
+    the time of each phase, the overall throughput, the latency of the
+    files written, and the slowest of them.
+    '''
+    _log.info('transfer timing:\n\n' + Fore.WHITE + '    phase:        wall (s):    file (s):    files:    size (MB):')
+    _log.flush()
+    for name, phase in summary['phases'].items():
+        wall_s = '{:.3f}'.format(phase['seconds']) if phase['seconds'] is not None else '-'
+        print(Fore.WHITE + '    {:<10}   {:>10}   {:>10.3f}   {:>7}   {:>11.1f}'.format(
+                name, wall_s, phase['file_seconds'], phase['files'], phase['bytes'] / 1e6))
+    print('')
+    if summary['throughput']:
+        _log.info('overall throughput:\t'+Fore.WHITE+'{:.1f}MB/s'.format(summary['throughput'] / 1e6))
+    if summary['latency']['p50'] is not None:
+        _log.info('per-file latency:\t'+Fore.WHITE+'p50 {:.3f}s, p95 {:.3f}s'.format(
+                summary['latency']['p50'], summary['latency']['p95']))
+    for event in summary['slowest']:
+        _log.info('slowest:\t'+Fore.WHITE+'{} '.format(event['file'])+Fore.CYAN+'({})'.format(format_throughput(event)))
+
+# confirm clean ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def confirm_clean(_log, target, count):
+    '''
+    Asks whether to delete the existing WAV files in the target directory,
+    returning True if so.
+    '''
+    _log.flush() # so the prompt follows any queued log messages
+    return input(Fore.RED + 'Delete {} existing WAV files in the target directory. Are you sure? (y/n): '.format(count)).lower().strip() == 'y'
+
+# transfer ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+async def transfer(_log, engine, options):
+    '''
+    Performs a transfer with the engine, asking before continuing once the
+    plan has been checked and before cleaning each target, then prints the
+    catalog and trace of the transfer.
+    '''
+    from core.engine import TransferError
+    targets = engine.targets
+    try:
+        # get all WAV files in source directory, checking their format as they're
+        # found and stopping once past the limit, and assign them memories
+        await engine.scan()
+        # check for an interrupted transfer, then check the plan against the
+        # RC-5's limits and the space on each target
+        plans = await engine.plan()
+    except TransferError as e:
+        _log.error('exit: {}'.format(e))
+        return
+    for target in targets:
+        if len(targets) > 1:
+            _log.info('target directory:\t'+Fore.MAGENTA+'{}'.format(target))
+        if not print_plan(_log, plans[target], engine.sync):
+            _log.error('exit: transfer exceeds the limits of the RC-5 or target.')
+            return
+
+    # we've got source and targets, continuing...
+    for target in targets:
+        _log.info('target directory:\t'+Fore.WHITE+'{}'.format(target))
+    _log.flush()
+    if input(Fore.RED + 'Continue? (y/n): ').lower().strip() != 'y':
+        _log.info(Fore.GREEN + 'user cancelled.')
+        return
+    _log.info(Fore.WHITE + 'continuing…')
+    if not await engine.clean(confirm=lambda target, count: confirm_clean(_log, target, count)):
+        _log.warning('exit: clean target directory failed.')
+        return
+    tstart = datetime.now()
+    catalogs = await engine.transfer()
+    if any(len(catalog) > 0 for catalog in catalogs.values()):
+        # write prefs upon successful transfer
+        prefs_write(_log, engine.source, targets)
+        # print the catalog of each target and add it to the catalog database,
+        # with the trace of the transfer alongside it
+        records = await engine.catalog()
+        for target in targets:
+            if len(targets) > 1:
+                _log.info('target directory:\t'+Fore.MAGENTA+'{}'.format(target))
+            print_catalog(_log, records[target])
+        runs = list(engine.runs.values())
+        _log.info('added {} to catalog database:\t'.format(
+                'run {}'.format(runs[0]) if len(runs) == 1 else 'runs {}'.format(', '.join(str(run) for run in runs)))
+                +Fore.WHITE+'{}'.format(CATALOG_FILE))
+        trace_filename = 'trace-rc5tx-run{}.json'.format(runs[0])
+        print_trace(_log, engine.trace.save(trace_filename))
+        _log.info('wrote trace file: {}'.format(trace_filename))
+    # we're done...
+    elapsed = ( datetime.now() - tstart )
+    elapsed_ms = int(elapsed.total_seconds() * 1000)
+    _log.info(Fore.GREEN + 'processing complete: {}ms elapsed.'.format(elapsed_ms))
+    _log.info('processed using command line:\n\n'+Fore.WHITE+'    rc5tx.py {}{} {}\n'.format(
+            format_options(options), engine.source, ' '.join(str(target) for target in targets)))
+
+# watch files ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+async def watch_sync(_log, engine):
+    '''
+    Performs one sync of a watch with the engine, adding it to the catalog
+    database.
+    '''
+    from core.engine import TransferError
+    target = engine.targets[0]
+    try:
+        await engine.scan()
+        plans = await engine.plan()
+    except TransferError as e:
+        _log.error('{}, not synced.'.format(str(e).rstrip('.')))
+        return
+    if not print_plan(_log, plans[target], sync=True):
+        _log.error('transfer exceeds the limits of the RC-5 or target, not synced.')
+        return
+    await engine.transfer()
+    await engine.catalog(kind='watch')
+    _log.info('added run {} to catalog database:\t'.format(engine.runs[target])+Fore.WHITE+'{}'.format(CATALOG_FILE))
+
+async def watch_files(_log, engine, interval=WATCH_INTERVAL, settle=WATCH_SETTLE):
+    '''
+    Keeps the engine's target synced with its source until interrupted. The
+    source is polled every 'interval' seconds for changed WAV files, and the
+    target for the RC-5 being mounted. A sync follows once neither has
+    changed for 'settle' seconds, so that a burst of changes (e.g., a folder
+    of loops being exported) is synced once, and only the memories changed
+    are written. Each sync is added to the catalog database.
+    '''
+    import asyncio
+    source, target = engine.source, engine.targets[0]
+    _log.info('watching source directory:\t'+Fore.WHITE+'{}'.format(source))
+    _log.info('      for target directory:\t'+Fore.MAGENTA+'{}'.format(target))
+    watcher = SourceWatcher(source, prune=is_hidden)
+    device  = None
+    # the time of the last change not yet synced, starting with a sync once mounted
+    pending = time.monotonic()
+    while True:
+        changed = watcher.poll()
+        if changed:
+            _log.info('source changed:\t'+Fore.WHITE+'{} files'.format(len(changed)))
+            pending = time.monotonic()
+        mounted = mounted_device(target)
+        if mounted != device:
+            if mounted is None:
+                _log.warning('target directory unmounted, waiting for the RC-5…')
+            else:
+                _log.info('target directory mounted:\t'+Fore.MAGENTA+'{}'.format(target))
+                pending = time.monotonic()
+            device = mounted
+        if pending is not None and device is not None and time.monotonic() - pending >= settle:
+            pending = None
+            try:
+                await watch_sync(_log, engine)
+            except OSError as e:
+                # e.g., the RC-5 unplugged mid-sync: the next change or mount syncs again
+                _log.error('Error: {} - {}, not synced.'.format(e.filename, e.strerror))
+            except ValueError as e:
+                _log.error('Error: {}, not synced.'.format(e))
+            _log.info(Fore.GREEN + 'watching for changes…')
+            _log.flush()
+        await asyncio.sleep(interval)
+
+# pull memories into an archive ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def pull_archive(_log, archive_dir, target, rehash=False, copy_method='auto', block_size=TRANSFER_BLOCK_SIZE):
+    '''
+    Backs up the memories of the target (WAVE) directory to the archive
+    directory, copying only those new or changed since the last pull, then
+    prints the catalog and trace of the pull and, if anything had changed,
+    adds it as a run to the catalog database.
+    '''
+    target = Path(target)
+    if not target.is_dir():
+        _log.error('exit: target directory does not exist: {} (is the RC-5 mounted as a USB device?)'.format(target))
+        return
+    if os.path.basename(os.path.normpath(target)) != 'WAVE':
+        _log.error('exit: expected target directory to be named "WAVE", not: {}'.format(os.path.basename(os.path.normpath(target))))
+        return
+    if copy_method not in COPY_METHODS:
+        _log.error('exit: expected a copy method of {}, not: {}'.format(', '.join(COPY_METHODS), copy_method))
+        return
+    started = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    archive = Archive(os.path.expanduser(archive_dir))
+    trace = Trace()
+    with trace.phase('pull'):
+        snapshot, records = pull_memories(_log, target, archive, rehash,
+                copy_options={ 'method': copy_method, 'block_size': block_size }, trace=trace)
+    if not records:
+        _log.warning('no memories found in target directory: {}'.format(target))
+        return
+    print_catalog(_log, records)
+    if snapshot:
+        catalog_db = Catalog(CATALOG_FILE)
+        try:
+            run = catalog_db.add_run(started, 'pull', target, snapshot, records)
+        finally:
+            catalog_db.close()
+        _log.info('added run {} to catalog database:\t'.format(run)+Fore.WHITE+'{}'.format(CATALOG_FILE))
+    print_trace(_log, trace.summary())
 
 # usage ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
 def usage():
     usage = '''
 Usage: 
 
-    rc5tx SOURCE_DIRECTORY TARGET_DIRECTORY'''
+    rc5tx [OPTIONS] SOURCE_DIRECTORY TARGET_DIRECTORY [TARGET_DIRECTORY ...]
+    rc5tx --export=FORMAT [--run=N]
+    rc5tx --find=MEMORY|FILENAME|HASH
+    rc5tx --pull=ARCHIVE_DIRECTORY [--rehash] [TARGET_DIRECTORY]
+
+Options:
+'''
+    for name, description in OPTIONS.items():
+        usage += '\n    --{:<12} {}'.format(name, description)
     print(Fore.WHITE + usage)
 
 # help ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
@@ -208,7 +444,7 @@ def help():
     HELP_TEXT2 = '''
 Upon successful execution a file named '{}' containing
 the default values is written to the current working directory. If this file is
-subsequently found, the two arguments are not required, though new command line
+subsequently found, the directory arguments are not required, though new command line
 arguments will override the defaults and rewrite the prefs file.
 '''.format(PREF_FILENAME)
     print(Fore.GREEN + COPYRIGHT)
@@ -221,106 +457,121 @@ def main(argv):
     '''
         This is the main function of the transfer script.
     '''
-    _log = Logger('rc5tx', Level.INFO)
-    signal.signal(signal.SIGINT, signal_handler)
+    _log = Logger('rc5tx', level=Level.INFO, queued=True)
+    signal.signal(signal.SIGINT, lambda signum, frame: signal_handler(signum, frame, _log))
 
     try:
+        argv, options = parse_options(argv)
+        for name in options:
+            if name not in OPTIONS:
+                _log.warning('exit: unrecognised option: --{}'.format(name))
+                usage()
+                print()
+                return
+        # queries of the catalog database need no source or target
+        if 'export' in options:
+            export_catalog(_log, options['export'], options.get('run'))
+            return
+        elif 'find' in options:
+            find_in_catalog(_log, options['find'])
+            return
+        sync = options.get('sync', False)
+        verify = options.get('verify', False)
+        resume = options.get('resume', False)
+        # watching keeps the target synced as either changes
+        watch = options.get('watch', False)
+        sync = sync or watch
+        # normalising needs the levels of each file
+        analyse = options.get('analyse', False)
+        normalise = options.get('normalise')
+        if normalise is not None:
+            try:
+                normalise = float(normalise)
+            except ValueError:
+                _log.error('exit: expected a loudness in LUFS, e.g., --normalise=-16, not: {}'.format(normalise))
+                return
+        block_size = TRANSFER_BLOCK_SIZE
+        if 'block' in options:
+            try:
+                block_size = int(float(options['block']) * 1024 * 1024)
+            except ValueError:
+                _log.error('exit: expected a block size in MB, e.g., --block=16, not: {}'.format(options['block']))
+                return
         pref_file = Path(PREF_FILE)
-        # we prefer 2 arguments over existence of prefs file
-        if len(argv) > 2:
-            _log.warning('exit: found {} arguments, expected two.'.format(len(argv)))
-            usage()
-            print()
+        # a pull reads from a single target, by default that of the prefs file
+        if 'pull' in options:
+            if options['pull'] is True:
+                _log.error('exit: expected an archive directory, e.g., --pull=~/rc5')
+                return
+            if len(argv) == 1:
+                target_args = argv
+            elif not argv and pref_file.exists():
+                pref_args = prefs_read(_log)
+                target_args = pref_args.get('targets') or [ pref_args.get('target') ]
+            else:
+                target_args = argv
+            if len(target_args) != 1:
+                _log.error('exit: expected a single target directory to pull from.')
+                return
+            pull_archive(_log, options['pull'], target_args[0], options.get('rehash', False),
+                    options.get('copy', 'auto'), block_size)
             return
-        elif len(argv) == 2:
+        # we prefer arguments over existence of prefs file
+        if len(argv) >= 2:
             _log.info('arguments:')
             for arg in argv:
                 _log.info('arg: {}'.format(arg))
             source_arg = argv[0]
-            target_arg = argv[1]
+            target_args = argv[1:]
+        elif len(argv) == 1:
+            _log.warning('exit: found 1 argument, expected a source and at least one target.')
+            usage()
+            print()
+            return
         elif pref_file.exists():
             _log.info('{} file found.'.format(PREF_FILE))
             # read prefs file...
             pref_args = prefs_read(_log)
             source_arg = pref_args.get('source')
-            target_arg = pref_args.get('target')
+            # earlier prefs files recorded a single target
+            target_args = pref_args.get('targets') or [ pref_args.get('target') ]
         else:
             _log.warning('exit: expected two arguments.')
             help()
             return
         _log.info('initialised.')
 
-        # validate: source directory
-        source = Path(source_arg)
-        if source.exists():
-            if source.is_dir():
-                _log.info('source directory:\t'+Fore.WHITE+'{}'.format(source_arg))
-            else:
-                raise NotADirectoryError('source argument is not a directory: {}'.format(source_arg))
-        else:
-            raise FileNotFoundError('source directory does not exist: {}'.format(source_arg))
-        # validate: target directory
-        target = Path(target_arg)
-        if target.exists():
-            if not target.is_dir():
-                raise NotADirectoryError('target argument is not a directory: {}'.format(target_arg))
-        else:
-            _log.error('target directory does not exist: {}'.format(target_arg))
-            _log.error('Is the RC-5 mounted as a USB device?')
-            return
-
-        # validate: check source and target aren't the same
-        if source == target:
-            _log.error('exit: source and target directory are the same:\t'+Fore.WHITE+'{}'.format(source_arg))
-            return
-        # validate: 'WAVE' as target directory
-        wave_dir = os.path.basename(os.path.normpath(target))
-        if wave_dir != 'WAVE':
-            _log.error('expected target directory to be named "WAVE", not: '+Fore.WHITE+'{}'.format(wave_dir))
-            return
-        _log.info('target directory:\t'+Fore.MAGENTA+'{}'.format(target))
-
-        # get all WAV files in source directory
-        source_files = []
-        source_list = source.rglob('*')
-        for f1 in source_list:
-            ext = os.path.splitext(f1)[-1].lower()
-            if f1.is_file() and ext == '.wav':
-                source_files.append(f1)
-
-        # validate: RC-5 has limit of 99 memories
-        if len(source_files) > 99:
-            _log.error('exit: too many source files ({})'.format(len(source_files)))
+        # the engine and asyncio are only imported once a transfer is to be made, not for --export, --find or --pull
+        import asyncio
+        from core.engine import TransferEngine, TransferError
+        # validate: source and target directories
+        try:
+            engine = TransferEngine(source_arg, target_args, log=_log, sync=sync, verify=verify, resume=resume,
+                    index_file=INDEX_FILE if options.get('index') else None, dedupe=options.get('dedupe'),
+                    analyse=analyse, normalise=normalise, waveform=options.get('waveform', False),
+                    playlist=options.get('playlist'), pins=options.get('pin'), catalog_file=CATALOG_FILE,
+                    copy_method=options.get('copy', 'auto'), block_size=block_size, fsync=options.get('fsync'),
+                    allow_missing=watch)
+        except TransferError as e:
+            _log.error('exit: {}'.format(e))
             return
+        signal.signal(signal.SIGINT, lambda signum, frame: signal_handler(signum, frame, _log, engine))
+        _log.info('source directory:\t'+Fore.WHITE+'{}'.format(engine.source))
+        for target in engine.targets:
+            if target.exists():
+                _log.info('target directory:\t'+Fore.MAGENTA+'{}'.format(target))
+            else:
+                _log.warning('target directory does not exist (yet): {}'.format(target))
+        if resume and sync:
+            _log.warning('the --resume option is ignored with --sync, which only copies what has changed.')
 
-        # sort list by filename
-        source_files.sort(key=get_filename)
-        _log.info('found {} source files (sorted):'.format(len(source_files)))
-        for f2 in source_files:
-            _log.info('source:\t'+Fore.WHITE+'{}'.format(f2))
-
-        # we've got source and target, continuing...
-        _log.info('target directory:\t'+Fore.WHITE+'{}'.format(target_arg))
-        if input(Fore.RED + 'Continue? (y/n): ').lower().strip() == 'y':
-            _log.info(Fore.WHITE + 'continuing…')
-            if clean_target_directory(_log, target):
-                tstart = datetime.now()
-                catalog = transfer_files(_log, source, source_files, target)
-                if len(catalog) > 0:
-                    # write prefs upon successful transfer
-                    prefs_write(_log, source, target)
-                    # print catalog
-                    print_catalog(_log, catalog)
-                # we're done...
-                tend = datetime.now()
-                elapsed = ( tend - tstart )
-                elapsed_ms = int(elapsed.microseconds / 1000)
-                _log.info(Fore.GREEN + 'processing complete: {}ms elapsed.'.format(elapsed_ms))
-                _log.info('processed using command line:\n\n'+Fore.WHITE+'    rc5tx.py {} {}\n'.format(source, target))
+        try:
+            if watch:
+                asyncio.run(watch_files(_log, engine))
             else:
-                _log.warning('exit: clean target directory failed.')
-        else:
-            _log.info(Fore.GREEN + 'user cancelled.')
+                asyncio.run(transfer(_log, engine, options))
+        finally:
+            engine.close()
 
     except KeyboardInterrupt:
         _log.error('caught Ctrl-C; exiting…')
@@ -329,6 +580,7 @@ def main(argv):
         _log.error('error executing rc5tx: {}'.format(traceback.format_exc()))
     finally:
         _log.info(Fore.GREEN + 'complete.')
+        _log.close()
 
 # ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
 if __name__== "__main__":
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Tests of the assignment of source files to memories and of the order in
+# which memories are renamed when reordered. Run from the repository with:
+#
+#    python3 -m unittest discover tests
+#
+
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.assigner import assign_memories, plan_renames, read_playlist
+
+TEMP = '.rc5tx-reorder'
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def apply_renames(moves, renames):
+    '''
+    Makes the renames on a dictionary of memory to its file (each memory
+    holding its own number), failing if a rename would overwrite a memory
+    not yet moved away, and returns the dictionary.
+    '''
+    held = { memory: memory for memory in moves }
+    for source, destination in renames:
+        if destination in held:
+            raise AssertionError('rename {} → {} overwrites memory {}'.format(source, destination, destination))
+        held[destination] = held.pop(source)
+    return held
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class PlanRenamesTest(unittest.TestCase):
+
+    def assertRenames(self, moves, count):
+        renames = plan_renames(moves, TEMP)
+        held = apply_renames(moves, renames)
+        self.assertEqual(held, { destination: source for source, destination in moves.items() })
+        self.assertEqual(len(renames), count)
+
+    def test_none(self):
+        self.assertEqual(plan_renames({}, TEMP), [])
+
+    def test_chain(self):
+        # each memory moves up one, the last into an empty memory
+        self.assertRenames({ 1: 2, 2: 3, 3: 4 }, 3)
+        self.assertEqual(plan_renames({ 1: 2, 2: 3 }, TEMP), [ ( 2, 3 ), ( 1, 2 ) ])
+
+    def test_swap(self):
+        self.assertRenames({ 1: 2, 2: 1 }, 3)
+
+    def test_cycle(self):
+        self.assertRenames({ 1: 2, 2: 3, 3: 4, 4: 1 }, 5)
+
+    def test_cycles_and_chain(self):
+        self.assertRenames({ 1: 2, 2: 1, 5: 6, 6: 7, 7: 5, 10: 11, 11: 12 }, 2 + 1 + 3 + 1 + 2)
+
+    def test_temp_is_vacated(self):
+        renames = plan_renames({ 1: 2, 2: 1 }, TEMP)
+        self.assertEqual([ destination for _, destination in renames ].count(TEMP), 1)
+        self.assertEqual(renames[-1][0], TEMP)
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class AssignMemoriesTest(unittest.TestCase):
+
+    SOURCE = '/loops'
+    FILES  = [ '/loops/a.wav', '/loops/b.wav', '/loops/c.wav', '/loops/d.wav' ]
+
+    def test_default_order(self):
+        self.assertEqual(assign_memories(self.SOURCE, self.FILES), self.FILES)
+
+    def test_order(self):
+        self.assertEqual(assign_memories(self.SOURCE, self.FILES, order=[ 'c.wav', 'a.wav' ]),
+                [ '/loops/c.wav', '/loops/a.wav', '/loops/b.wav', '/loops/d.wav' ])
+
+    def test_pins(self):
+        self.assertEqual(assign_memories(self.SOURCE, self.FILES, pins=[ ( 1, 'd.wav' ), ( 3, 'b.wav' ) ]),
+                [ '/loops/d.wav', '/loops/a.wav', '/loops/b.wav', '/loops/c.wav' ])
+
+    def test_gap(self):
+        # memories skipped by a pin are left empty
+        self.assertEqual(assign_memories(self.SOURCE, self.FILES[:2], pins=[ ( 5, 'a.wav' ) ]),
+                [ '/loops/b.wav', None, None, None, '/loops/a.wav' ])
+
+    def test_ambiguous_name(self):
+        files = [ '/loops/x/a.wav', '/loops/y/a.wav' ]
+        with self.assertRaises(ValueError):
+            assign_memories(self.SOURCE, files, order=[ 'a.wav' ])
+        self.assertEqual(assign_memories(self.SOURCE, files, order=[ 'y/a.wav' ]), [ '/loops/y/a.wav', '/loops/x/a.wav' ])
+
+    def test_invalid_pins(self):
+        for pins in ( [ ( 0, 'a.wav' ) ], [ ( 5, 'a.wav' ) ], [ ( 1, 'a.wav' ), ( 1, 'b.wav' ) ],
+                [ ( 1, 'a.wav' ), ( 2, 'a.wav' ) ], [ ( 1, 'z.wav' ) ] ):
+            with self.assertRaises(ValueError, msg=pins):
+                assign_memories(self.SOURCE, self.FILES, pins=pins, memories=4)
+
+    def test_more_files_than_memories(self):
+        with self.assertRaises(ValueError):
+            assign_memories(self.SOURCE, self.FILES, memories=3)
+        with self.assertRaises(ValueError):
+            assign_memories(self.SOURCE, self.FILES, pins=[ ( 3, 'a.wav' ) ], memories=3)
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class ReadPlaylistTest(unittest.TestCase):
+
+    def test_playlist(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# set\n01 intro.wav\n\nverse.wav\n37: outro.wav\n2:bridge.wav\n')
+        try:
+            names, pins = read_playlist(f.name)
+        finally:
+            os.remove(f.name)
+        # a name that begins with a number is not a pin
+        self.assertEqual(names, [ '01 intro.wav', 'verse.wav' ])
+        self.assertEqual(pins, [ ( 37, 'outro.wav' ), ( 2, 'bridge.wav' ) ])
+
+    def test_names_with_colons(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('12:34 take.wav\n0:zero.wav\n100:hundred.wav\n:empty.wav\n12:35 take.wav\n')
+        try:
+            names, pins = read_playlist(f.name, known={ '12:34 take.wav' })
+        finally:
+            os.remove(f.name)
+        # only a memory number from 1 to 99 pins a file, and never a line naming a source file
+        self.assertEqual(names, [ '12:34 take.wav', '0:zero.wav', '100:hundred.wav', ':empty.wav' ])
+        self.assertEqual(pins, [ ( 12, '35 take.wav' ) ])
+
+if __name__ == '__main__':
+    unittest.main()
+
+#EOF
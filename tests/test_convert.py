@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Tests of the resampling of converted files: that what lies below the
+# output's Nyquist frequency passes unchanged and what lies above it isn't
+# aliased back. Run from the repository with:
+#
+#    python3 -m unittest discover tests
+#
+
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+    from core.convert import SincResampler
+except ImportError:
+    np = None # numpy is only needed to convert files
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def resample(frames, source_rate, target_rate, chunk_frames):
+    '''
+    Resamples the frames to 44.1kHz, passing them to the resampler in chunks.
+    '''
+    resampler = SincResampler(source_rate, target_rate, len(frames), frames.shape[1])
+    out = [ resampler.process(frames[i:i + chunk_frames]) for i in range(0, len(frames), chunk_frames) ]
+    out.append(resampler.flush())
+    out = np.concatenate(out)
+    assert len(out) == resampler.output_frames
+    return out
+
+def level(source_rate, frequency):
+    '''
+    Returns the level in dB, relative to its input, of a one second sine wave
+    of the frequency resampled from the source rate to 44.1kHz, ignoring the
+    ends of the output where the filter reaches past the input.
+    '''
+    t = np.arange(source_rate) / source_rate
+    sine = np.sin(2.0 * np.pi * frequency * t).astype(np.float32)[:, np.newaxis]
+    out = resample(sine, source_rate, 44100, 16384)[2000:-2000, 0]
+    return 20.0 * np.log10(np.sqrt(2.0 * np.mean(out.astype(np.float64) ** 2)) + 1e-12)
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+@unittest.skipIf(np is None, 'numpy is not installed')
+class SincResamplerTest(unittest.TestCase):
+
+    def test_passband(self):
+        for source_rate in ( 22050, 48000, 96000 ):
+            for frequency in ( 1000, 10000 ):
+                self.assertAlmostEqual(level(source_rate, frequency), 0.0, delta=0.05, msg=( source_rate, frequency ))
+        self.assertAlmostEqual(level(48000, 19000), 0.0, delta=0.1)
+
+    def test_aliasing(self):
+        # linear interpolation aliased 23kHz at 48kHz to 21.1kHz at about -5dB
+        for source_rate, frequency in ( ( 48000, 23000 ), ( 96000, 23000 ), ( 96000, 40000 ) ):
+            self.assertLess(level(source_rate, frequency), -80.0, msg=( source_rate, frequency ))
+
+    def test_chunks(self):
+        # the output doesn't depend on how the input is divided into chunks (but for rounding)
+        frames = np.random.default_rng(0).uniform(-1.0, 1.0, ( 10000, 2 )).astype(np.float32)
+        for source_rate in ( 8000, 48000, 96000 ):
+            expected = resample(frames, source_rate, 44100, len(frames))
+            for chunk_frames in ( 1, 333, 4096 ):
+                np.testing.assert_allclose(resample(frames, source_rate, 44100, chunk_frames), expected, atol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
+
+#EOF
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2023-2026 by Ichiro Furusato. All rights reserved. This file is part
+# of the rc5tx project, released under the MIT License. Please see the LICENSE
+# file included as part of this package.
+#
+# author:   Ichiro Furusato
+# created:  2026-10-17
+# modified: 2026-10-17
+#
+# Tests that a dry run of a sync leaves the target as it was. Run from the
+# repository with:
+#
+#    python3 -m unittest discover tests
+#
+
+import os, sys, shutil, struct, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.logger import Logger, Level
+from core.transfer import sync_files
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def write_wav(path, frames, value):
+    '''
+    Writes a WAV file in the RC-5's native format (stereo 44.1kHz float32)
+    of the given number of frames, every sample of the given value.
+    '''
+    fmt = struct.pack('<HHIIHH', 3, 2, 44100, 44100 * 8, 8, 32)
+    data = struct.pack('<f', value) * ( frames * 2 )
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 4 + 8 + len(fmt) + 8 + len(data)) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<I', len(fmt)) + fmt)
+        f.write(b'data' + struct.pack('<I', len(data)) + data)
+
+# ┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈┈
+def snapshot(directory):
+    '''
+    Returns a dictionary of each file beneath the directory to its content
+    and modification time, and of each directory to None.
+    '''
+    tree = {}
+    for root, dirs, files in os.walk(directory):
+        for name in dirs:
+            tree[os.path.relpath(os.path.join(root, name), directory)] = None
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                tree[os.path.relpath(path, directory)] = ( f.read(), os.stat(path).st_mtime_ns )
+    return tree
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+class DryRunSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self._log = Logger('test', level=Level.ERROR)
+        self._root = tempfile.mkdtemp()
+        self._source = os.path.join(self._root, 'loops')
+        self._target = os.path.join(self._root, 'WAVE')
+        os.makedirs(self._source)
+        os.makedirs(self._target)
+        self._files = []
+        for i, name in enumerate([ 'a.wav', 'b.wav', 'c.wav', 'd.wav' ]):
+            path = os.path.join(self._source, name)
+            write_wav(path, 100 + i, 0.1 * i)
+            self._files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def assertDryRunUnchanged(self, source_files):
+        before = snapshot(self._target)
+        sync_files(self._log, self._source, source_files, self._target, dry_run=True)
+        self.assertEqual(snapshot(self._target), before)
+
+    def test_empty_target(self):
+        self.assertDryRunUnchanged(self._files)
+        self.assertEqual(os.listdir(self._target), [])
+
+    def test_reorder(self):
+        sync_files(self._log, self._source, self._files[:3], self._target)
+        # the first two memories are swapped, one file replaced and another added
+        self.assertDryRunUnchanged([ self._files[1], self._files[0], self._files[3], self._files[2] ])
+
+    def test_cleared(self):
+        sync_files(self._log, self._source, self._files, self._target)
+        self.assertDryRunUnchanged(self._files[:1])
+
+if __name__ == '__main__':
+    unittest.main()
+
+#EOF